@@ -0,0 +1,67 @@
+"""Add reserved_quantity counter to foods
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('foods',
+        sa.Column('reserved_quantity', sa.Integer(), nullable=False, server_default='0')
+    )
+
+    # Backfill the counter from existing reservations
+    bind = op.get_bind()
+    active = _enum_label(bind, 'reservationstatus', 'active')
+    expired = _enum_label(bind, 'reservationstatus', 'expired')
+
+    # Holds that already timed out should not count towards the counter
+    bind.execute(
+        sa.text(
+            "UPDATE reservations SET status = CAST(:expired AS reservationstatus) "
+            "WHERE status = CAST(:active AS reservationstatus) AND expires_at <= now()"
+        ),
+        {"active": active, "expired": expired},
+    )
+
+    bind.execute(
+        sa.text(
+            "UPDATE foods SET reserved_quantity = COALESCE(("
+            "SELECT SUM(r.quantity) FROM reservations r "
+            "WHERE r.food_id = foods.id AND r.status = CAST(:active AS reservationstatus)"
+            "), 0)"
+        ),
+        {"active": active},
+    )
+
+
+def _enum_label(bind, type_name: str, value: str) -> str:
+    """
+    Resolve the stored label of a Postgres enum value
+
+    Tables created by 001 use lowercase values while tables created by
+    Base.metadata.create_all use the uppercase member names.
+    """
+    labels = bind.execute(
+        sa.text(
+            "SELECT e.enumlabel FROM pg_enum e "
+            "JOIN pg_type t ON t.oid = e.enumtypid WHERE t.typname = :name"
+        ),
+        {"name": type_name},
+    ).scalars().all()
+
+    return next(label for label in labels if label.lower() == value)
+
+
+def downgrade() -> None:
+    op.drop_column('foods', 'reserved_quantity')
@@ -0,0 +1,31 @@
+"""Link reservations to their order
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing holds stay unlinked; they time out within RESERVATION_TIMEOUT_MINUTES
+    op.add_column('reservations', sa.Column('order_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_reservations_order_id_orders', 'reservations', 'orders',
+        ['order_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index(op.f('ix_reservations_order_id'), 'reservations', ['order_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_reservations_order_id'), table_name='reservations')
+    op.drop_constraint('fk_reservations_order_id_orders', 'reservations', type_='foreignkey')
+    op.drop_column('reservations', 'order_id')
@@ -0,0 +1,49 @@
+"""Composite indexes for hot query shapes
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) - verify with scripts/check_indexes.py
+INDEXES = [
+    ('ix_foods_restaurant_id_is_available', 'foods', ['restaurant_id', 'is_available']),
+    ('ix_reservations_food_id_status_expires_at', 'reservations', ['food_id', 'status', 'expires_at']),
+    ('ix_reservations_user_id_status', 'reservations', ['user_id', 'status']),
+    ('ix_reservations_status_expires_at', 'reservations', ['status', 'expires_at']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_order_items_food_id', 'order_items', ['food_id']),
+    ('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at']),
+    ('ix_payments_user_id', 'payments', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction and
+    # does not block writes on live tables
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,50 @@
+"""Add geohash cell index to users
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.geohash import encode
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('geohash', sa.String(length=12), nullable=True))
+    op.create_index(
+        'ix_users_geohash', 'users', ['geohash'],
+        unique=False,
+        postgresql_ops={'geohash': 'varchar_pattern_ops'},
+    )
+
+    # Backfill from existing coordinates
+    bind = op.get_bind()
+    users = sa.table('users',
+        sa.column('id', sa.Integer()),
+        sa.column('latitude', sa.Float()),
+        sa.column('longitude', sa.Float()),
+        sa.column('geohash', sa.String()),
+    )
+    rows = bind.execute(
+        sa.select(users.c.id, users.c.latitude, users.c.longitude)
+        .where(users.c.latitude.isnot(None), users.c.longitude.isnot(None))
+    ).all()
+
+    if rows:
+        bind.execute(
+            users.update().where(users.c.id == sa.bindparam('user_id')).values(geohash=sa.bindparam('cell')),
+            [{'user_id': row.id, 'cell': encode(row.latitude, row.longitude)} for row in rows],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_geohash', table_name='users')
+    op.drop_column('users', 'geohash')
@@ -0,0 +1,29 @@
+"""Add catalog version stamps
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('catalog_versions',
+        sa.Column('scope', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('scope')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_versions')
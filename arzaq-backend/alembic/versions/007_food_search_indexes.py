@@ -0,0 +1,52 @@
+"""Full-text and trigram search indexes on foods
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+# Must match app.models.food.search_vector()
+SEARCH_VECTOR = (
+    "(setweight(to_tsvector('simple'::regconfig, name), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B'))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_foods_search_vector', 'foods', [sa.text(SEARCH_VECTOR)],
+            unique=False,
+            if_not_exists=True,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_foods_name_trgm', 'foods', ['name'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in ('ix_foods_name_trgm', 'ix_foods_search_vector'):
+            op.drop_index(
+                name, table_name='foods',
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
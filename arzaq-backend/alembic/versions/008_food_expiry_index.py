@@ -0,0 +1,33 @@
+"""Index for expired food lookups
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_foods_is_available_expires_at', 'foods', ['is_available', 'expires_at'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_foods_is_available_expires_at', table_name='foods',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
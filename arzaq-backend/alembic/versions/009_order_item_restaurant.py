@@ -0,0 +1,61 @@
+"""Snapshot the restaurant of each order item
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_order_items_restaurant_id_order_id', 'order_items', ['restaurant_id', 'order_id']),
+    ('ix_orders_status_created_at', 'orders', ['status', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    op.add_column('order_items', sa.Column('restaurant_id', sa.Integer(), nullable=True))
+
+    # Backfill from the ordered food (foods never change restaurant)
+    op.execute(
+        "UPDATE order_items SET restaurant_id = "
+        "(SELECT foods.restaurant_id FROM foods WHERE foods.id = order_items.food_id)"
+    )
+
+    with op.batch_alter_table('order_items') as batch_op:
+        batch_op.alter_column('restaurant_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key(
+            'fk_order_items_restaurant_id_users', 'users',
+            ['restaurant_id'], ['id'], ondelete='RESTRICT'
+        )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
+
+    with op.batch_alter_table('order_items') as batch_op:
+        batch_op.drop_constraint('fk_order_items_restaurant_id_users', type_='foreignkey')
+        batch_op.drop_column('restaurant_id')
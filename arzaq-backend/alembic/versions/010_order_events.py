@@ -0,0 +1,38 @@
+"""Order event log for live restaurant queues
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'order_events',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('restaurant_id', sa.Integer(), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['restaurant_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_order_events_restaurant_id_id', 'order_events', ['restaurant_id', 'id'], unique=False)
+    op.create_index(op.f('ix_order_events_created_at'), 'order_events', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_order_events_created_at'), table_name='order_events')
+    op.drop_index('ix_order_events_restaurant_id_id', table_name='order_events')
+    op.drop_table('order_events')
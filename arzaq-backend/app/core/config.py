@@ -1,6 +1,6 @@
 # app/core/config.py
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 
@@ -58,11 +58,69 @@ class Settings(BaseSettings):
     def ALLOWED_EXTENSIONS_LIST(self) -> List[str]:
         return self.ALLOWED_EXTENSIONS.split(",")
 
-    # QR Codes
+    # Storage of uploads and QR codes: "local" (UPLOAD_DIR, single replica) or "s3"
+    STORAGE_BACKEND: str = "local"
+    S3_BUCKET: Optional[str] = None
+    S3_ENDPOINT_URL: Optional[str] = None  # e.g. http://minio:9000; None for AWS
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_KEY_PREFIX: str = ""  # e.g. "uploads/" to share a bucket
+    S3_PUBLIC_URL: Optional[str] = None  # Public bucket/CDN base URL; presigned URLs otherwise
+    S3_PRESIGN_SECONDS: int = 3600
+    S3_MAX_POOL_CONNECTIONS: int = 20
+
+    # Image variants (resized copies of uploads, see app/utils/images.py)
+    IMAGE_VARIANT_WIDTHS: str = "160,480,960"
+    IMAGE_VARIANT_QUALITY: int = 80
+    IMAGE_WORKERS: int = 2  # Processes rendering variants
+    IMAGE_PROCESS_ATTEMPTS: int = 3
+    IMAGE_RETRY_DELAY_SECONDS: float = 2.0  # Multiplied by the attempt number
+
+    @property
+    def IMAGE_VARIANT_WIDTHS_LIST(self) -> List[int]:
+        return sorted(int(width) for width in self.IMAGE_VARIANT_WIDTHS.split(","))
+
+    # Menu import
+    FOOD_IMPORT_BATCH_SIZE: int = 500  # Rows per INSERT/commit
+    FOOD_IMPORT_MAX_ROWS: int = 50000
+    FOOD_IMPORT_MAX_REPORTED_ERRORS: int = 100
+
+    # QR Codes (rendered on demand; QR_CODE_DIR only holds files of older orders)
     QR_CODE_DIR: str = "./uploads/qr_codes"
+    QR_CACHE_MAX_ENTRIES: int = 1024  # Encoded images kept in memory per worker
+    QR_CACHE_TTL_SECONDS: int = 86400
 
     # Reservation
     RESERVATION_TIMEOUT_MINUTES: int = 10
+    RESERVATION_REAPER_ENABLED: bool = True
+    RESERVATION_REAPER_INTERVAL_SECONDS: int = 5  # Max time between reaper ticks
+    RESERVATION_REAPER_BATCH_SIZE: int = 500  # Reservations expired per UPDATE
+
+    # Food expiry
+    FOOD_EXPIRY_SWEEPER_ENABLED: bool = True
+    FOOD_EXPIRY_SWEEP_INTERVAL_SECONDS: int = 60
+    FOOD_EXPIRY_SWEEP_BATCH_SIZE: int = 1000  # Foods retired per UPDATE
+
+    # Public catalog cache
+    CATALOG_CACHE_TTL_SECONDS: int = 30  # Also bounds availability staleness across workers
+    CATALOG_CACHE_MAX_ENTRIES: int = 2048
+    CATALOG_VERSION_CHECK_SECONDS: float = 1.0  # Max age of a worker's view of catalog versions
+
+    # Live food feed (Server-Sent Events)
+    FOOD_EVENTS_QUEUE_SIZE: int = 256  # Events buffered per client before it is dropped
+    FOOD_EVENTS_KEEPALIVE_SECONDS: int = 20  # Comment sent on idle streams to keep proxies open
+    FOOD_EVENTS_RECONNECT_SECONDS: int = 5  # LISTEN connection retry delay; also sent as SSE retry
+
+    # Live restaurant order queue (WebSocket)
+    ORDER_EVENTS_QUEUE_SIZE: int = 256  # Events buffered per connection before it is dropped
+    ORDER_EVENTS_KEEPALIVE_SECONDS: int = 20  # Keepalive message sent on idle connections
+    ORDER_EVENTS_RECONNECT_SECONDS: int = 5  # LISTEN connection retry delay
+    ORDER_EVENTS_REPLAY_LIMIT: int = 500  # Max events replayed on reconnect; older gaps need a reload
+    ORDER_EVENTS_RETENTION_HOURS: int = 24
+    ORDER_EVENTS_PRUNER_ENABLED: bool = True
+    ORDER_EVENTS_PRUNE_INTERVAL_SECONDS: int = 3600
+    ORDER_EVENTS_PRUNE_BATCH_SIZE: int = 5000  # Events deleted per DELETE
 
     class Config:
         env_file = ".env"
@@ -1,7 +1,7 @@
 # app/core/database.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
 
 # Create database engine
@@ -34,3 +34,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def try_advisory_lock(db: Session, key: int) -> bool:
+    """
+    Try to take a transaction-scoped Postgres advisory lock
+
+    The lock is released automatically on commit/rollback. Used so that
+    only one replica runs a background job at a time. Databases without
+    advisory locks (SQLite in development) always get the lock.
+
+    Args:
+        db: Database session
+        key: Application-wide lock identifier
+
+    Returns:
+        True if the lock was acquired
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+
+    return bool(db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": key}).scalar())
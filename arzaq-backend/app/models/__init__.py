@@ -4,6 +4,8 @@ from app.models.food import Food
 from app.models.order import Order, OrderItem
 from app.models.reservation import Reservation
 from app.models.payment import Payment
+from app.models.catalog import CatalogVersion
+from app.models.order_event import OrderEvent
 
 __all__ = [
     "User",
@@ -12,4 +14,6 @@ __all__ = [
     "OrderItem",
     "Reservation",
     "Payment",
+    "CatalogVersion",
+    "OrderEvent",
 ]
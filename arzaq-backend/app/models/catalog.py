@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class CatalogVersion(Base):
+    """
+    Version stamp of a slice of the public food catalog
+
+    Bumped whenever foods in the scope are created, updated or deleted.
+    Every API worker compares cached catalog responses against these
+    stamps, so a write on one worker invalidates the caches of all others.
+
+    Scopes: "global" (whole catalog) and "restaurant:<id>".
+    """
+
+    __tablename__ = "catalog_versions"
+
+    scope = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<CatalogVersion(scope='{self.scope}', version={self.version})>"
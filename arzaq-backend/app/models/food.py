@@ -1,6 +1,7 @@
 # app/models/food.py
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Index, DDL, event, text
 from sqlalchemy.orm import relationship
+from typing import Optional
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -9,6 +10,10 @@ class Food(Base):
     """Food item model"""
 
     __tablename__ = "foods"
+    __table_args__ = (
+        Index("ix_foods_restaurant_id_is_available", "restaurant_id", "is_available"),
+        Index("ix_foods_is_available_expires_at", "is_available", "expires_at"),
+    )
 
     # Primary Key
     id = Column(Integer, primary_key=True, index=True)
@@ -25,7 +30,8 @@ class Food(Base):
 
     # Inventory
     quantity = Column(Integer, nullable=False, default=0)  # Total portions created
-    # Note: available_quantity is calculated as (quantity - reserved_count)
+    reserved_quantity = Column(Integer, nullable=False, default=0, server_default="0")  # Held by active reservations
+    # Note: available_quantity is calculated as (quantity - reserved_quantity)
 
     # Availability
     is_available = Column(Boolean, default=True)  # Manual override for availability
@@ -50,28 +56,61 @@ class Food(Base):
     def available_quantity(self) -> int:
         """
         Calculate available quantity after reservations
-        Returns: quantity - sum of active reservations
+        Returns: quantity - portions held by active reservations
         """
-        from app.models.reservation import Reservation
-        from datetime import datetime
-
-        # Sum active (non-expired) reservations
-        reserved = sum(
-            r.quantity
-            for r in self.reservations
-            if r.expires_at > datetime.utcnow() and r.status == "active"
-        )
-
-        return max(0, self.quantity - reserved)
+        return max(0, (self.quantity or 0) - (self.reserved_quantity or 0))
 
     @property
     def is_in_stock(self) -> bool:
         """Check if food item is in stock"""
         return self.available_quantity > 0 and self.is_available
 
+    @staticmethod
+    def compute_discount(price: float, old_price: Optional[float]) -> Optional[int]:
+        """Discount percentage for a price, None without a higher old_price"""
+        if old_price and old_price > price:
+            return int(((old_price - price) / old_price) * 100)
+        return None
+
     def calculate_discount(self):
         """Calculate discount percentage from old_price and price"""
-        if self.old_price and self.old_price > self.price:
-            self.discount = int(((self.old_price - self.price) / self.old_price) * 100)
-        else:
-            self.discount = None
+        self.discount = self.compute_discount(self.price, self.old_price)
+
+
+# Full-text search (Postgres)
+#
+# SQLite has no equivalent, so these indexes are only created on Postgres;
+# dev setups search through an in-memory index (app/services/search.py).
+
+# No stemming: listings mix Russian, Kazakh and English words
+SEARCH_CONFIG = text("'simple'::regconfig")
+
+
+def search_vector():
+    """
+    Weighted tsvector of a food: name (A) ranks above description (B)
+
+    Queries must use this exact expression to be served by ix_foods_search_vector.
+    """
+    return func.setweight(func.to_tsvector(SEARCH_CONFIG, Food.name), text("'A'")).op("||")(
+        func.setweight(
+            func.to_tsvector(SEARCH_CONFIG, func.coalesce(Food.description, text("''"))),
+            text("'B'"),
+        )
+    )
+
+
+Index("ix_foods_search_vector", search_vector(), postgresql_using="gin").ddl_if(dialect="postgresql")
+
+# Trigram index for typo-tolerant name matching
+Index(
+    "ix_foods_name_trgm", Food.name,
+    postgresql_using="gin",
+    postgresql_ops={"name": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+
+event.listen(
+    Food.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -1,5 +1,5 @@
 # app/models/order.py
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -20,6 +20,10 @@ class Order(Base):
     """Order model"""
 
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+        Index("ix_orders_status_created_at", "status", "created_at"),
+    )
 
     # Primary Key
     id = Column(Integer, primary_key=True, index=True)
@@ -50,6 +54,7 @@ class Order(Base):
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
     payment = relationship("Payment", back_populates="order", uselist=False)
+    reservations = relationship("Reservation", back_populates="order")
 
     def __repr__(self):
         return f"<Order(id={self.id}, user_id={self.user_id}, status='{self.status}', total={self.total})>"
@@ -57,20 +62,24 @@ class Order(Base):
     @property
     def restaurant_ids(self) -> list:
         """Get unique restaurant IDs from order items"""
-        return list(set(item.food.restaurant_id for item in self.items))
+        return list(set(item.restaurant_id for item in self.items))
 
 
 class OrderItem(Base):
     """Order item model - individual food items in an order"""
 
     __tablename__ = "order_items"
+    __table_args__ = (
+        Index("ix_order_items_restaurant_id_order_id", "restaurant_id", "order_id"),
+    )
 
     # Primary Key
     id = Column(Integer, primary_key=True, index=True)
 
     # Foreign Keys
-    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
-    food_id = Column(Integer, ForeignKey("foods.id", ondelete="RESTRICT"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
+    food_id = Column(Integer, ForeignKey("foods.id", ondelete="RESTRICT"), nullable=False, index=True)
+    restaurant_id = Column(Integer, ForeignKey("users.id", ondelete="RESTRICT"), nullable=False)  # Food's restaurant at time of order
 
     # Item Details (snapshot at time of order)
     quantity = Column(Integer, nullable=False)
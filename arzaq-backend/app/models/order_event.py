@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class OrderEvent(Base):
+    """
+    Change to an order, as pushed to a restaurant's live queue
+
+    One row per (event, restaurant with items in the order). The id is the
+    event's sequence number: a reconnecting tablet sends the last one it
+    saw and gets everything after it replayed from this table. Rows are
+    pruned after ORDER_EVENTS_RETENTION_HOURS.
+    """
+
+    __tablename__ = "order_events"
+    __table_args__ = (
+        Index("ix_order_events_restaurant_id_id", "restaurant_id", "id"),
+    )
+
+    # Primary Key (sequence number); SQLite only autoincrements INTEGER keys
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+
+    restaurant_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    type = Column(String(20), nullable=False)
+    payload = Column(JSON, nullable=False)  # Event body as sent to clients
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<OrderEvent(id={self.id}, restaurant_id={self.restaurant_id}, order_id={self.order_id}, type='{self.type}')>"
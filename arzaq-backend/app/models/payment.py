@@ -30,7 +30,7 @@ class Payment(Base):
 
     # Foreign Keys
     order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, unique=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # Payment Details
     payment_method = Column(Enum(PaymentMethod), nullable=False, default=PaymentMethod.PAYBOX)
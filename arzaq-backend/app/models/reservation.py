@@ -1,5 +1,5 @@
 # app/models/reservation.py
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum, String
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum, String, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -23,6 +23,11 @@ class Reservation(Base):
     """
 
     __tablename__ = "reservations"
+    __table_args__ = (
+        Index("ix_reservations_food_id_status_expires_at", "food_id", "status", "expires_at"),
+        Index("ix_reservations_user_id_status", "user_id", "status"),
+        Index("ix_reservations_status_expires_at", "status", "expires_at"),  # Reservation reaper
+    )
 
     # Primary Key
     id = Column(Integer, primary_key=True, index=True)
@@ -30,6 +35,7 @@ class Reservation(Base):
     # Foreign Keys
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     food_id = Column(Integer, ForeignKey("foods.id", ondelete="CASCADE"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=True, index=True)
 
     # Reservation Details
     quantity = Column(Integer, nullable=False)
@@ -44,6 +50,7 @@ class Reservation(Base):
 
     # Relationships
     food = relationship("Food", back_populates="reservations")
+    order = relationship("Order", back_populates="reservations")
 
     def __repr__(self):
         return f"<Reservation(id={self.id}, food_id={self.food_id}, quantity={self.quantity}, status='{self.status}')>"
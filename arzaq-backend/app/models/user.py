@@ -1,5 +1,5 @@
 # app/models/user.py
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Float, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -17,6 +17,10 @@ class User(Base):
     """User model - handles both clients and restaurants"""
 
     __tablename__ = "users"
+    __table_args__ = (
+        # Pattern ops so that "geohash LIKE 'prefix%'" can use the index
+        Index("ix_users_geohash", "geohash", postgresql_ops={"geohash": "varchar_pattern_ops"}),
+    )
 
     # Primary Key
     id = Column(Integer, primary_key=True, index=True)
@@ -41,6 +45,7 @@ class User(Base):
     description = Column(String(1000), nullable=True)
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)  # Derived from latitude/longitude
     rating = Column(Float, nullable=True, default=0.0)
 
     # Timestamps
@@ -69,3 +74,15 @@ class User(Base):
     def is_admin(self) -> bool:
         """Check if user is an admin"""
         return self.role == UserRole.ADMIN
+
+
+@event.listens_for(User, "before_insert")
+@event.listens_for(User, "before_update")
+def _sync_geohash(mapper, connection, target):
+    """Keep geohash in sync with latitude/longitude"""
+    from app.utils.geohash import encode  # Import here to avoid circular imports
+
+    if target.latitude is not None and target.longitude is not None:
+        target.geohash = encode(target.latitude, target.longitude)
+    else:
+        target.geohash = None
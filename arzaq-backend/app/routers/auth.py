@@ -20,6 +20,7 @@ from app.schemas.user import (
     Token,
     SupabaseAuthRequest
 )
+from app.services.catalog_cache import invalidate_catalog
 from app.utils.geocoding import geocode_address
 
 router = APIRouter()
@@ -147,6 +148,8 @@ async def supabase_auth(auth_data: SupabaseAuthRequest, db: Session = Depends(ge
         # Update full_name if it changed
         if user.full_name != auth_data.full_name:
             user.full_name = auth_data.full_name
+            if user.is_restaurant:
+                invalidate_catalog(db, restaurant_ids=[user.id])
 
         db.commit()
         db.refresh(user)
@@ -223,6 +226,10 @@ async def update_current_user(
         if coordinates:
             current_user.latitude, current_user.longitude = coordinates
 
+    # Catalog responses embed the restaurant name
+    if current_user.is_restaurant and "full_name" in user_update:
+        invalidate_catalog(db, restaurant_ids=[current_user.id])
+
     db.commit()
     db.refresh(current_user)
 
@@ -1,9 +1,10 @@
 # app/routers/foods.py
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, case, or_
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
-import os
-import uuid
 from datetime import datetime
 
 from app.core.database import get_db
@@ -11,52 +12,70 @@ from app.core.security import get_current_user, get_current_active_restaurant
 from app.core.config import settings
 from app.models.user import User
 from app.models.food import Food
-from app.schemas.food import FoodCreate, FoodUpdate, FoodResponse
+from app.schemas.food import FoodCreate, FoodUpdate, FoodResponse, FoodListResponse, FoodBulkRequest, FoodBulkResponse, FoodImportResponse
+from app.services.availability import not_expired
+from app.services.search import search_catalog
+from app.services.bulk_foods import upsert_foods
+from app.services.food_import import import_foods, IMPORT_FORMATS
+from app.services.catalog_cache import catalog_cache, invalidate_catalog, restaurant_scope, GLOBAL_SCOPE
+from app.services.uploads import save_upload_file
+from app.services.image_pipeline import image_pipeline
+from app.services.food_events import publish_food_events, stream_food_events
+from app.utils import geohash
+from app.utils.images import variant_urls
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.http_cache import is_not_modified, not_modified, cache_headers
 
 router = APIRouter()
 
 
-def save_upload_file(upload_file: UploadFile) -> str:
+def catalog_query(db: Session):
     """
-    Save uploaded file and return its path
+    Query food rows shaped like FoodResponse, restaurant_name included
 
-    Args:
-        upload_file: FastAPI UploadFile
-
-    Returns:
-        Relative path to saved file
-
-    Raises:
-        HTTPException: If file is invalid
+    Selects plain columns joined to the restaurant instead of hydrating
+    Food objects, so a page of any size costs a single query.
     """
-    # Validate file extension
-    file_ext = upload_file.filename.split(".")[-1].lower()
-    if file_ext not in settings.ALLOWED_EXTENSIONS_LIST:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type not allowed. Allowed: {settings.ALLOWED_EXTENSIONS}"
-        )
-
-    # Validate file size
-    upload_file.file.seek(0, 2)  # Seek to end
-    file_size = upload_file.file.tell()
-    upload_file.file.seek(0)  # Reset to start
+    return db.query(
+        Food.id,
+        Food.name,
+        Food.description,
+        Food.image,
+        Food.price,
+        Food.old_price,
+        Food.discount,
+        Food.quantity,
+        case(
+            (Food.quantity > Food.reserved_quantity, Food.quantity - Food.reserved_quantity),
+            else_=0,
+        ).label("available_quantity"),
+        Food.is_available,
+        Food.expires_at,
+        Food.restaurant_id,
+        User.full_name.label("restaurant_name"),
+        Food.created_at,
+        Food.updated_at,
+    ).join(User, Food.restaurant_id == User.id)
+
+
+def filter_catalog(query, restaurant_id: Optional[int] = None, available_only: bool = False):
+    """Apply the public restaurant/availability filters to a catalog query"""
+    if restaurant_id:
+        query = query.filter(Food.restaurant_id == restaurant_id)
 
-    if file_size > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Max size: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
+    if available_only:
+        query = query.filter(
+            Food.is_available == True,
+            Food.quantity > Food.reserved_quantity,
+            not_expired()
         )
 
-    # Generate unique filename
-    unique_filename = f"{uuid.uuid4()}.{file_ext}"
-    file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
+    return query
 
-    # Save file
-    with open(file_path, "wb") as f:
-        f.write(upload_file.file.read())
 
-    return f"/uploads/{unique_filename}"
+def catalog_response(etag: str, payload: bytes) -> Response:
+    """Serve a serialized catalog response with its validators"""
+    return Response(content=payload, media_type="application/json", headers=cache_headers(etag))
 
 
 @router.post("/upload-image", response_model=dict)
@@ -73,10 +92,13 @@ async def upload_food_image(
 
     Returns:
         - image_url: URL to access the uploaded image
+        - image_variants: URLs of resized WebP/JPEG copies, available
+          shortly after the upload
     """
-    image_url = save_upload_file(file)
+    image_url = await save_upload_file(file)
+    image_pipeline.submit(image_url)
 
-    return {"image_url": image_url}
+    return {"image_url": image_url, "image_variants": variant_urls(image_url)}
 
 
 @router.post("/", response_model=FoodResponse, status_code=status.HTTP_201_CREATED)
@@ -109,6 +131,9 @@ async def create_food(
     new_food.calculate_discount()
 
     db.add(new_food)
+    db.flush()
+    invalidate_catalog(db, restaurant_ids=[current_user.id])
+    publish_food_events(db, "created", [new_food.id])
     db.commit()
     db.refresh(new_food)
 
@@ -118,43 +143,256 @@ async def create_food(
     return new_food
 
 
-@router.get("/", response_model=List[FoodResponse])
+@router.post("/bulk", response_model=FoodBulkResponse)
+async def bulk_upsert_foods(
+    bulk_data: FoodBulkRequest,
+    current_user: User = Depends(get_current_active_restaurant),
+    db: Session = Depends(get_db)
+):
+    """
+    Create and update many food items at once (max 100)
+
+    - Requires approved restaurant role
+    - Items with an `id` update that food (same fields as PUT), others
+      create a food (same fields as POST)
+    - Invalid items (field validation included) are reported in `results`
+      and skipped; all valid items are saved together
+    """
+    results = upsert_foods(db, current_user.id, bulk_data.items)
+    db.commit()
+
+    counts = {status: 0 for status in ("created", "updated", "failed")}
+    for result in results:
+        counts[result["status"]] += 1
+
+    return {"results": results, **counts}
+
+
+@router.post("/import", response_model=FoodImportResponse)
+async def import_food_file(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Query(None, alias="format", pattern="^(csv|jsonl)$"),
+    current_user: User = Depends(get_current_active_restaurant),
+    db: Session = Depends(get_db)
+):
+    """
+    Import food items from a POS export
+
+    - Requires approved restaurant role
+    - CSV (with a header row) or JSONL, one food per row/line, with the
+      same fields as POST /api/foods/
+    - **format**: csv or jsonl (default: from the file extension)
+    - Rows are saved in batches; invalid rows are reported by line number
+      and skipped
+    """
+    if file_format is None:
+        extension = (file.filename or "").rsplit(".", 1)[-1].lower()
+        file_format = "jsonl" if extension in ("jsonl", "ndjson") else extension
+
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported file type. Allowed: csv, jsonl"
+        )
+
+    # Parsing and batch inserts block; keep them off the event loop
+    return await run_in_threadpool(import_foods, db, current_user.id, file.file, file_format)
+
+
+@router.get("/", response_model=FoodListResponse)
 async def get_all_foods(
+    request: Request,
     restaurant_id: Optional[int] = None,
     available_only: bool = True,
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_total: bool = False,
     db: Session = Depends(get_db)
 ):
     """
-    Get all available food items
+    Get all available food items, newest first
 
     - **restaurant_id**: Filter by restaurant (optional)
     - **available_only**: Show only available items (default: true)
-    - **skip**: Pagination offset
-    - **limit**: Number of items to return
+    - **cursor**: `next_cursor` from the previous page (omit for the first page)
+    - **limit**: Number of items to return (max 100)
+    - **include_total**: Also count all matching items (slower)
+
+    Supports conditional requests: send the ETag back in If-None-Match to
+    get 304 Not Modified while the page is unchanged.
     """
-    query = db.query(Food)
+    # Restaurant pages only go stale on that restaurant's writes
+    scope = restaurant_scope(restaurant_id) if restaurant_id else GLOBAL_SCOPE
+    cache_key = catalog_cache.key(db, scope, "list", restaurant_id, available_only, cursor, limit, include_total)
+    etag = catalog_cache.etag(cache_key)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    payload = catalog_cache.get(cache_key)
+    if payload is not None:
+        return catalog_response(etag, payload)
+
+    query = filter_catalog(catalog_query(db), restaurant_id, available_only)
+
+    total = query.count() if include_total else None
+
+    # Keyset pagination: an index range scan from the last row of the
+    # previous page, no matter how deep the client scrolls. Ids are assigned
+    # in insertion order, so id order is creation order.
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.filter(Food.id < last_id)
+
+    foods = query.order_by(Food.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(foods) > limit:
+        foods = foods[:limit]
+        next_cursor = encode_cursor(foods[-1].id)
+
+    payload = FoodListResponse.model_validate(
+        {
+            "items": foods,
+            "next_cursor": next_cursor,
+            "total": total,
+            "page_size": limit,
+        },
+        from_attributes=True,
+    ).model_dump_json().encode()
+
+    catalog_cache.set(
+        cache_key, payload,
+        tags=[scope] + [f"food:{food.id}" for food in foods],
+        expires_at=[food.expires_at for food in foods],
+    )
 
-    # Filter by restaurant
-    if restaurant_id:
-        query = query.filter(Food.restaurant_id == restaurant_id)
+    return catalog_response(etag, payload)
 
-    # Filter by availability
-    if available_only:
+
+@router.get("/nearby", response_model=FoodListResponse)
+async def get_nearby_foods(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5.0, gt=0, le=50),
+    available_only: bool = True,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_total: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Get food items near a location, closest first
+
+    - **lat**, **lon**: Search origin
+    - **radius_km**: Search radius in kilometres (max 50)
+    - **available_only**: Show only available items (default: true)
+    - **cursor**: `next_cursor` from the previous page (omit for the first page)
+    - **limit**: Number of items to return (max 100)
+    - **include_total**: Also count all matching items (slower)
+
+    Each item includes `distance_km` from the origin.
+    """
+    # Prune candidates to the 3x3 block of geohash cells around the origin
+    precision = geohash.precision_for_radius(radius_km, lat)
+    cells = geohash.neighbors(geohash.encode(lat, lon, precision))
+
+    # Distances are computed by the database, which returns only one page
+    distance = geohash.distance_km(lat, lon, User.latitude, User.longitude)
+    query = catalog_query(db).add_columns(distance.label("distance_km")).filter(
+        or_(*[User.geohash.like(f"{cell}%") for cell in cells]),
+        distance <= radius_km,
+    )
+    query = filter_catalog(query, available_only=available_only)
+
+    total = query.count() if include_total else None
+
+    # Keyset pagination over (distance, id)
+    if cursor:
+        last_distance, last_id = decode_cursor(cursor, float, int)
         query = query.filter(
-            Food.is_available == True,
-            Food.quantity > 0
+            or_(distance > last_distance, and_(distance == last_distance, Food.id > last_id))
         )
 
-    # Apply pagination
-    foods = query.offset(skip).limit(limit).all()
+    rows = query.order_by(distance, Food.id).limit(limit + 1).all()
 
-    # Add restaurant_name to each food
-    for food in foods:
-        food.restaurant_name = food.restaurant.full_name
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].distance_km, rows[-1].id)
 
-    return foods
+    return {
+        "items": [
+            {**row._mapping, "distance_km": round(row.distance_km, 3)}
+            for row in rows
+        ],
+        "next_cursor": next_cursor,
+        "total": total,
+        "page_size": limit,
+    }
+
+
+@router.get("/search", response_model=List[FoodResponse])
+async def search_foods(
+    q: str = Query(..., min_length=1, max_length=100),
+    restaurant_id: Optional[int] = None,
+    available_only: bool = True,
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """
+    Search food items by name and description, best matches first
+
+    - **q**: Search text; each word matches word prefixes ("лагм" finds "Лагман")
+    - **restaurant_id**: Filter by restaurant (optional)
+    - **available_only**: Show only available items (default: true)
+    - **limit**: Number of items to return (max 50)
+
+    When nothing matches, names are matched fuzzily so small typos still
+    find results.
+    """
+    query = filter_catalog(catalog_query(db), restaurant_id, available_only)
+
+    return search_catalog(db, query, q, limit)
+
+
+@router.get("/stream")
+async def stream_foods(
+    restaurant_id: Optional[int] = None,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(5.0, gt=0, le=50),
+):
+    """
+    Live feed of food drops and stock changes (Server-Sent Events)
+
+    - **restaurant_id**: Only foods of this restaurant (optional)
+    - **lat**, **lon**, **radius_km**: Only foods of restaurants in the
+      geohash cells around this point (optional, same cells as /nearby;
+      a few events from just outside the radius may arrive)
+
+    Events: `food.created`, `food.updated`, `food.deleted` and
+    `food.stock`, each with `id`, `restaurant_id`, `geohash` and (except
+    for deletions) `available_quantity` and `is_available`. Fetch the food
+    for full details. An `overflow` event means the client fell behind
+    and should reload the catalog before reconnecting.
+    """
+    if (lat is None) != (lon is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="lat and lon must be given together"
+        )
+
+    cells = None
+    if lat is not None:
+        precision = geohash.precision_for_radius(radius_km, lat)
+        cells = geohash.neighbors(geohash.encode(lat, lon, precision))
+
+    # No database session is held for the lifetime of the stream
+    return StreamingResponse(
+        stream_food_events(restaurant_id, cells, settings.FOOD_EVENTS_KEEPALIVE_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/me", response_model=List[FoodResponse])
@@ -168,19 +406,24 @@ async def get_my_foods(
     - Requires approved restaurant role
     - Returns all foods (including unavailable)
     """
-    foods = db.query(Food).filter(Food.restaurant_id == current_user.id).all()
-
-    # Add restaurant_name
-    for food in foods:
-        food.restaurant_name = current_user.full_name
+    foods = catalog_query(db).filter(Food.restaurant_id == current_user.id).all()
 
     return foods
 
 
 @router.get("/{food_id}", response_model=FoodResponse)
-async def get_food_by_id(food_id: int, db: Session = Depends(get_db)):
+async def get_food_by_id(food_id: int, request: Request, db: Session = Depends(get_db)):
     """Get food item by ID"""
-    food = db.query(Food).filter(Food.id == food_id).first()
+    cache_key = catalog_cache.key(db, GLOBAL_SCOPE, "item", food_id)
+    etag = catalog_cache.etag(cache_key)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    payload = catalog_cache.get(cache_key)
+    if payload is not None:
+        return catalog_response(etag, payload)
+
+    food = catalog_query(db).filter(Food.id == food_id).first()
 
     if not food:
         raise HTTPException(
@@ -188,10 +431,14 @@ async def get_food_by_id(food_id: int, db: Session = Depends(get_db)):
             detail="Food item not found"
         )
 
-    # Add restaurant_name
-    food.restaurant_name = food.restaurant.full_name
+    payload = FoodResponse.model_validate(food).model_dump_json().encode()
+    catalog_cache.set(
+        cache_key, payload,
+        tags=[f"food:{food_id}", restaurant_scope(food.restaurant_id)],
+        expires_at=[food.expires_at],
+    )
 
-    return food
+    return catalog_response(etag, payload)
 
 
 @router.put("/{food_id}", response_model=FoodResponse)
@@ -224,6 +471,14 @@ async def update_food(
 
     # Update fields
     update_data = food_data.dict(exclude_unset=True)
+
+    # Portions held by active reservations cannot be removed
+    if update_data.get("quantity") is not None and update_data["quantity"] < food.reserved_quantity:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Quantity cannot be lower than reserved portions ({food.reserved_quantity})"
+        )
+
     for field, value in update_data.items():
         setattr(food, field, value)
 
@@ -231,6 +486,8 @@ async def update_food(
     food.calculate_discount()
     food.updated_at = datetime.utcnow()
 
+    invalidate_catalog(db, restaurant_ids=[food.restaurant_id], food_ids=[food.id])
+    publish_food_events(db, "updated", [food.id])
     db.commit()
     db.refresh(food)
 
@@ -268,6 +525,8 @@ async def delete_food(
         )
 
     db.delete(food)
+    invalidate_catalog(db, restaurant_ids=[food.restaurant_id], food_ids=[food.id])
+    publish_food_events(db, "deleted", [food.id], restaurant_id=food.restaurant_id)
     db.commit()
 
     return None
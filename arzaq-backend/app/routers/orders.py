@@ -1,55 +1,30 @@
 # app/routers/orders.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status, Request, Response, WebSocket
+from sqlalchemy import String, and_, insert, literal, or_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional
 from datetime import datetime
-import uuid
-import qrcode
-import os
+from collections import defaultdict
 
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
 from app.core.security import get_current_user
 from app.core.config import settings
 from app.models.user import User
 from app.models.order import Order, OrderItem, OrderStatus
 from app.models.food import Food
 from app.models.reservation import Reservation, ReservationStatus
-from app.schemas.order import OrderCreate, OrderResponse, OrderItemResponse
+from app.schemas.order import OrderCreate, OrderResponse, OrderListResponse
+from app.services.availability import reserve, cancel_reservations, confirm_order_reservations, expire_reservations
+from app.services.order_events import order_event_broker, publish_order_event, replay_order_events, stream_order_events
+from app.services.pickup import complete_pickup, diagnose_pickup, has_restaurant_items
+from app.services.qr_codes import QR_FORMATS, new_pickup_code, is_valid_qr_code_signature, qr_code_url, qr_code_cache
+from app.utils.http_cache import make_etag, is_not_modified, not_modified, cache_headers
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
 
-def generate_qr_code(pickup_code: str) -> str:
-    """
-    Generate QR code for order pickup
-
-    Args:
-        pickup_code: Unique pickup code
-
-    Returns:
-        Path to QR code image
-    """
-    # Create QR code
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_H,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(pickup_code)
-    qr.make(fit=True)
-
-    # Generate image
-    img = qr.make_image(fill_color="black", back_color="white")
-
-    # Save to file
-    filename = f"{pickup_code}.png"
-    filepath = os.path.join(settings.QR_CODE_DIR, filename)
-    img.save(filepath)
-
-    return f"/uploads/qr_codes/{filename}"
-
-
 @router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order_data: OrderCreate,
@@ -67,26 +42,49 @@ async def create_order(
 
     **Note:** Order becomes PAID after successful payment via PayBox
     """
+    # Total portions requested per food (a cart may repeat a food)
+    requested = defaultdict(int)
+    for item in order_data.items:
+        requested[item.food_id] += item.quantity
+
+    # Load and lock every food in the cart with one query. Locking in id
+    # order means two carts sharing foods can never deadlock each other.
+    foods = {
+        food.id: food
+        for food in db.query(Food)
+        .filter(Food.id.in_(requested.keys()))
+        .order_by(Food.id)
+        .with_for_update()
+        .all()
+    }
+
+    missing = [food_id for food_id in requested if food_id not in foods]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Food item with ID {missing[0]} not found"
+        )
+
+    # Release holds that timed out so their portions can be reserved again
+    expire_reservations(db, foods.keys())
+
+    # Reserve inventory with one conditional UPDATE (no overselling)
+    unavailable = reserve(db, requested)
+
+    if unavailable:
+        db.rollback()
+        food = foods[min(unavailable)]
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Food item '{food.name}' is not available in requested quantity"
+        )
+
     # Validate and calculate order totals
     order_items_data = []
     subtotal = 0.0
 
     for item in order_data.items:
-        # Get food item
-        food = db.query(Food).filter(Food.id == item.food_id).first()
-
-        if not food:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Food item with ID {item.food_id} not found"
-            )
-
-        # Check availability
-        if not food.is_available or food.available_quantity < item.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Food item '{food.name}' is not available in requested quantity"
-            )
+        food = foods[item.food_id]
 
         # Calculate item totals
         item_subtotal = food.price * item.quantity
@@ -94,7 +92,8 @@ async def create_order(
         platform_amount = item_subtotal * 0.1  # 10% platform fee
 
         order_items_data.append({
-            "food": food,
+            "food_id": food.id,
+            "restaurant_id": food.restaurant_id,
             "quantity": item.quantity,
             "price": food.price,
             "subtotal": item_subtotal,
@@ -121,78 +120,156 @@ async def create_order(
     db.add(new_order)
     db.flush()  # Get order ID without committing
 
-    # Create order items
-    for item_data in order_items_data:
-        order_item = OrderItem(
-            order_id=new_order.id,
-            food_id=item_data["food"].id,
-            quantity=item_data["quantity"],
-            price=item_data["price"],
-            subtotal=item_data["subtotal"],
-            restaurant_amount=item_data["restaurant_amount"],
-            platform_amount=item_data["platform_amount"],
-        )
-        db.add(order_item)
+    # Create order items with one bulk INSERT ... RETURNING
+    order_items = db.scalars(
+        insert(OrderItem).returning(OrderItem),
+        [{"order_id": new_order.id, **item_data} for item_data in order_items_data],
+    ).all()
 
-    # Create reservations (10-minute hold)
-    for item in order_data.items:
-        reservation = Reservation(
-            user_id=current_user.id,
-            food_id=item.food_id,
-            quantity=item.quantity,
-            status=ReservationStatus.ACTIVE,
-            expires_at=Reservation.create_expiration_time(settings.RESERVATION_TIMEOUT_MINUTES),
-        )
-        db.add(reservation)
+    # Create reservations (10-minute hold) with one bulk INSERT
+    expires_at = Reservation.create_expiration_time(settings.RESERVATION_TIMEOUT_MINUTES)
+    db.execute(
+        insert(Reservation),
+        [
+            {
+                "user_id": current_user.id,
+                "food_id": item.food_id,
+                "order_id": new_order.id,
+                "quantity": item.quantity,
+                "status": ReservationStatus.ACTIVE,
+                "expires_at": expires_at,
+            }
+            for item in order_data.items
+        ],
+    )
+
+    # Build response from what is already loaded (no refresh / lazy loads)
+    for order_item in order_items:
+        order_item.food_name = foods[order_item.food_id].name
+    set_committed_value(new_order, "items", order_items)
+    response = OrderResponse.model_validate(new_order)
 
+    publish_order_event(db, "created", new_order.id)
     db.commit()
-    db.refresh(new_order)
-
-    # Build response with item details
-    new_order.items = [
-        OrderItemResponse(
-            id=item.id,
-            food_id=item.food_id,
-            food_name=item.food.name,
-            quantity=item.quantity,
-            price=item.price,
-            subtotal=item.subtotal,
-            restaurant_amount=item.restaurant_amount,
-            platform_amount=item.platform_amount,
+
+    return response
+
+
+def parse_status_filter(status_filter: Optional[str]) -> Optional[OrderStatus]:
+    """
+    Parse an optional order status query parameter
+
+    Raises:
+        HTTPException: If the status is unknown
+    """
+    if not status_filter:
+        return None
+
+    try:
+        return OrderStatus(status_filter.lower())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid status. Must be one of: {[s.value for s in OrderStatus]}"
         )
-        for item in new_order.items
-    ]
 
-    return new_order
+
+def attach_food_names(db: Session, orders: List[Order]):
+    """Set food_name on the (already loaded) items of orders with one query"""
+    food_ids = {item.food_id for order in orders for item in order.items}
+    if not food_ids:
+        return
+
+    names = dict(db.query(Food.id, Food.name).filter(Food.id.in_(food_ids)).all())
+    for order in orders:
+        for item in order.items:
+            item.food_name = names[item.food_id]
+
+
+def created_at_before(db: Session, created_at: datetime, order_id: int):
+    """
+    Filter for orders after a (created_at, id) cursor in newest-first order
+
+    SQLite stores server-default timestamps as "YYYY-MM-DD HH:MM:SS" text,
+    which never compares equal to a bound datetime, so the cursor value is
+    bound in the stored format there.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        created_at = literal(created_at.strftime("%Y-%m-%d %H:%M:%S"), String)
+
+    return or_(
+        Order.created_at < created_at,
+        and_(Order.created_at == created_at, Order.id < order_id),
+    )
 
 
-@router.get("/", response_model=List[OrderResponse])
+@router.get("/", response_model=OrderListResponse)
 async def get_my_orders(
+    status_filter: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_total: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get current user's orders
+    Get current user's orders, newest first
 
-    Returns all orders for the authenticated user
+    - **status_filter**: Optional filter by order status (pending, paid, confirmed, ready, completed, cancelled)
+    - **cursor**: `next_cursor` from the previous page (omit for the first page)
+    - **limit**: Number of orders to return (max 100)
+    - **include_total**: Also count all matching orders (slower)
     """
-    orders = db.query(Order).filter(Order.user_id == current_user.id).all()
+    query = db.query(Order).filter(Order.user_id == current_user.id)
 
-    # Add food names to items
-    for order in orders:
-        for item in order.items:
-            item.food_name = item.food.name
+    status_enum = parse_status_filter(status_filter)
+    if status_enum:
+        query = query.filter(Order.status == status_enum)
 
-    return orders
+    total = query.count() if include_total else None
+
+    # Keyset pagination over (created_at, id), served by ix_orders_user_id_created_at
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor, datetime, int)
+        query = query.filter(created_at_before(db, last_created_at, last_id))
+
+    # Items in one extra query for the whole page, food names in another
+    orders = (
+        query.options(selectinload(Order.items))
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+
+    attach_food_names(db, orders)
+
+    return {
+        "items": orders,
+        "next_cursor": next_cursor,
+        "total": total,
+        "page_size": limit,
+    }
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order_by_id(
     order_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get order details by ID"""
+    """
+    Get order details by ID
+
+    Supports conditional requests (ETag / Last-Modified): pollers get
+    304 Not Modified until the order changes.
+    """
     order = db.query(Order).filter(Order.id == order_id).first()
 
     if not order:
@@ -208,6 +285,13 @@ async def get_order_by_id(
             detail="Not authorized to view this order"
         )
 
+    # Items are immutable once the order exists; only the row itself changes
+    etag = make_etag(order.id, order.status, order.updated_at, order.paid_at, order.completed_at, order.qr_code_path)
+    last_modified = order.updated_at or order.created_at
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    response.headers.update(cache_headers(etag, last_modified))
+
     # Add food names
     for item in order.items:
         item.food_name = item.food.name
@@ -230,7 +314,7 @@ async def confirm_order_payment(
     1. Update order status to PAID
     2. Convert reservations to CONFIRMED
     3. Deduct quantity from food items
-    4. Generate QR code for pickup
+    4. Assign the pickup code (its QR code is rendered on request)
     """
     order = db.query(Order).filter(Order.id == order_id).first()
 
@@ -240,30 +324,30 @@ async def confirm_order_payment(
             detail="Order not found"
         )
 
+    # Confirm reservations and deduct inventory. Holds released before
+    # the payment arrived are sold again if the portions are still there
+    unavailable = confirm_order_reservations(db, order.id)
+    if unavailable:
+        # Sold out meanwhile: the order cannot be fulfilled and must be refunded
+        order.status = OrderStatus.CANCELLED
+        cancel_reservations(db, Reservation.order_id == order.id)
+        publish_order_event(db, "status", order.id)
+        db.commit()
+
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Items sold out before payment arrived (food IDs: {sorted(unavailable)}). Order cancelled; the payment must be refunded."
+        )
+
     # Update order status
     order.status = OrderStatus.PAID
     order.paid_at = datetime.utcnow()
 
-    # Generate pickup code and QR code
-    pickup_code = f"ARZAQ-{order.id}-{uuid.uuid4().hex[:8].upper()}"
-    order.pickup_code = pickup_code
-    order.qr_code_path = generate_qr_code(pickup_code)
-
-    # Confirm reservations and deduct inventory
-    reservations = db.query(Reservation).filter(
-        Reservation.user_id == current_user.id,
-        Reservation.status == ReservationStatus.ACTIVE
-    ).all()
-
-    for reservation in reservations:
-        # Mark reservation as confirmed
-        reservation.status = ReservationStatus.CONFIRMED
-
-        # Deduct from food quantity
-        food = db.query(Food).filter(Food.id == reservation.food_id).first()
-        if food:
-            food.quantity -= reservation.quantity
+    # Assign pickup code; the QR image is rendered by GET /{order_id}/qr/...
+    order.pickup_code = new_pickup_code(order.id)
+    order.qr_code_path = qr_code_url(order.id, order.pickup_code)
 
+    publish_order_event(db, "paid", order.id)
     db.commit()
     db.refresh(order)
 
@@ -274,18 +358,34 @@ async def confirm_order_payment(
     return order
 
 
-@router.get("/{order_id}/qr", response_model=dict)
+async def qr_code_response(request: Request, pickup_code: str, image_format: str) -> Response:
+    """The QR code image of a pickup code, or 304 when the client has it"""
+    # The pickup code never changes, so it identifies the image
+    etag = make_etag(pickup_code, image_format)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    image = await qr_code_cache.get(pickup_code, image_format)
+
+    return Response(content=image, media_type=QR_FORMATS[image_format], headers=cache_headers(etag))
+
+
+@router.get("/{order_id}/qr")
 async def get_order_qr_code(
     order_id: int,
+    request: Request,
+    image_format: Optional[str] = Query(None, alias="format", pattern="^(png|svg)$"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get QR code for order pickup
 
-    Returns QR code image URL and pickup code
+    - Without **format**: returns the pickup code and the QR code image URL
+      (usable without a token, e.g. as an `<img>` src)
+    - **format**: png or svg; returns the QR code image itself
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = db.query(Order.user_id, Order.pickup_code).filter(Order.id == order_id).first()
 
     if not order:
         raise HTTPException(
@@ -306,10 +406,38 @@ async def get_order_qr_code(
             detail="Order not paid yet. QR code will be available after payment."
         )
 
-    return {
-        "pickup_code": order.pickup_code,
-        "qr_code_url": order.qr_code_path,
-    }
+    if image_format is None:
+        return {
+            "pickup_code": order.pickup_code,
+            "qr_code_url": qr_code_url(order_id, order.pickup_code),
+        }
+
+    return await qr_code_response(request, order.pickup_code, image_format)
+
+
+@router.get("/{order_id}/qr/{signature}.{image_format}")
+async def get_order_qr_image(
+    order_id: int,
+    signature: str,
+    request: Request,
+    image_format: str = Path(..., pattern="^(png|svg)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    QR code image for order pickup, without authentication
+
+    The URL comes from `qr_code_path` or `qr_code_url`; its signature
+    stands in for the bearer token.
+    """
+    pickup_code = db.query(Order.pickup_code).filter(Order.id == order_id).scalar()
+
+    if not pickup_code or not is_valid_qr_code_signature(order_id, pickup_code, signature):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="QR code not found"
+        )
+
+    return await qr_code_response(request, pickup_code, image_format)
 
 
 @router.put("/{order_id}/complete", response_model=OrderResponse)
@@ -334,6 +462,7 @@ async def complete_order(
     order.status = OrderStatus.COMPLETED
     order.completed_at = datetime.utcnow()
 
+    publish_order_event(db, "picked_up", order.id)
     db.commit()
     db.refresh(order)
 
@@ -346,49 +475,106 @@ async def complete_order(
 
 # ===== RESTAURANT ENDPOINTS =====
 
-@router.get("/restaurant/orders", response_model=List[OrderResponse])
+@router.get("/restaurant/orders", response_model=OrderListResponse)
 async def get_restaurant_orders(
     status_filter: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_total: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get all orders for current restaurant's food items
+    Get orders containing current restaurant's food items, newest first
 
     - Requires restaurant role
     - **status_filter**: Optional filter by order status (pending, paid, confirmed, ready, completed, cancelled)
-    - Returns orders containing items from this restaurant
+    - **cursor**: `next_cursor` from the previous page (omit for the first page)
+    - **limit**: Number of orders to return (max 100)
+    - **include_total**: Also count all matching orders (slower)
     """
     from app.core.security import get_current_active_restaurant
 
     # Verify user is an approved restaurant
     restaurant = await get_current_active_restaurant(current_user)
 
-    # Get all orders that contain this restaurant's food items
-    query = db.query(Order).join(OrderItem).join(Food).filter(
-        Food.restaurant_id == restaurant.id
-    )
+    # EXISTS on the restaurant_id snapshot: no join to foods, no DISTINCT
+    query = db.query(Order).filter(Order.items.any(OrderItem.restaurant_id == restaurant.id))
 
     # Filter by status if provided
-    if status_filter:
+    status_enum = parse_status_filter(status_filter)
+    if status_enum:
+        query = query.filter(Order.status == status_enum)
+
+    total = query.count() if include_total else None
+
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor, datetime, int)
+        query = query.filter(created_at_before(db, last_created_at, last_id))
+
+    orders = (
+        query.options(selectinload(Order.items))
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+
+    attach_food_names(db, orders)
+
+    return {
+        "items": orders,
+        "next_cursor": next_cursor,
+        "total": total,
+        "page_size": limit,
+    }
+
+
+@router.websocket("/restaurant/ws")
+async def restaurant_order_feed(
+    websocket: WebSocket,
+    token: str,
+    since: Optional[int] = None,
+):
+    """
+    Live order queue of the current restaurant (WebSocket)
+
+    - **token**: Access token (browsers cannot set headers on WebSockets)
+    - **since**: `seq` of the last event received; missed events are
+      replayed first. Without it only new events are sent.
+
+    Messages are JSON: order events (`seq`, `type` created/paid/status/
+    picked_up, `order_id`, `status`, this restaurant's `items`), plus
+    `{"type": "keepalive"}` on idle connections. `{"type": "reset"}` means
+    events could not be replayed and `{"type": "overflow"}` that the client
+    fell behind; reload GET /restaurant/orders in both cases.
+    """
+    from app.core.security import get_current_active_restaurant
+
+    db = SessionLocal()
+    try:
         try:
-            status_enum = OrderStatus(status_filter.lower())
-            query = query.filter(Order.status == status_enum)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status. Must be one of: {[s.value for s in OrderStatus]}"
-            )
-
-    # Get distinct orders (avoid duplicates from JOIN)
-    orders = query.distinct().order_by(Order.created_at.desc()).all()
-
-    # Add food names to items
-    for order in orders:
-        for item in order.items:
-            item.food_name = item.food.name
+            restaurant = await get_current_active_restaurant(await get_current_user(token, db))
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+
+        # Subscribe before reading the replay so nothing falls in between
+        subscription = order_event_broker.subscribe(restaurant_id=restaurant.id)
+        try:
+            replay = replay_order_events(db, restaurant.id, since) if since is not None else []
+        except Exception:
+            order_event_broker.unsubscribe(subscription)
+            raise
+    finally:
+        db.close()
 
-    return orders
+    # From here on stream_order_events owns (and releases) the subscription
+    await stream_order_events(websocket, subscription, replay, settings.ORDER_EVENTS_KEEPALIVE_SECONDS)
 
 
 @router.put("/{order_id}/restaurant-update", response_model=OrderResponse)
@@ -427,12 +613,7 @@ async def update_order_status(
         )
 
     # Check if order contains this restaurant's items
-    restaurant_item = any(
-        item.food.restaurant_id == restaurant.id
-        for item in order.items
-    )
-
-    if not restaurant_item:
+    if not db.query(has_restaurant_items(restaurant.id, order.id)).scalar():
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="This order doesn't contain your restaurant's items"
@@ -453,12 +634,12 @@ async def update_order_status(
 
     # Update status
     order.status = OrderStatus(new_status.lower())
+    publish_order_event(db, "status", order.id)
     db.commit()
     db.refresh(order)
 
     # Add food names
-    for item in order.items:
-        item.food_name = item.food.name
+    attach_food_names(db, [order])
 
     return order
 
@@ -481,8 +662,21 @@ async def verify_pickup_code(
     # Verify user is an approved restaurant
     restaurant = await get_current_active_restaurant(current_user)
 
-    # Find order by pickup code
-    order = db.query(Order).filter(Order.pickup_code == pickup_code).first()
+    # Lookup, ownership check and completion in one UPDATE ... RETURNING
+    completed = complete_pickup(db, pickup_code, restaurant.id)
+
+    if completed is not None:
+        db.commit()
+        return {
+            "success": True,
+            "message": "Order picked up successfully",
+            "order_id": completed.id,
+            "customer_name": completed.full_name,
+            "completed_at": completed.completed_at
+        }
+
+    # Nothing matched: find out why
+    order = diagnose_pickup(db, pickup_code, restaurant.id)
 
     if not order:
         raise HTTPException(
@@ -490,13 +684,7 @@ async def verify_pickup_code(
             detail="Invalid pickup code"
         )
 
-    # Check if order contains this restaurant's items
-    restaurant_item = any(
-        item.food.restaurant_id == restaurant.id
-        for item in order.items
-    )
-
-    if not restaurant_item:
+    if not order.owned:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="This order doesn't belong to your restaurant"
@@ -508,20 +696,11 @@ async def verify_pickup_code(
             "success": True,
             "message": "Order already completed",
             "order_id": order.id,
-            "customer_name": order.user.full_name,
+            "customer_name": order.full_name,
             "completed_at": order.completed_at
         }
 
-    # Mark as completed
-    order.status = OrderStatus.COMPLETED
-    order.completed_at = datetime.utcnow()
-
-    db.commit()
-
-    return {
-        "success": True,
-        "message": "Order picked up successfully",
-        "order_id": order.id,
-        "customer_name": order.user.full_name,
-        "completed_at": order.completed_at
-    }
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Order cannot be picked up (status: {order.status.value})"
+    )
@@ -1,5 +1,5 @@
 # app/routers/payments.py
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
 import hashlib
 import requests
@@ -12,7 +12,12 @@ from app.core.config import settings
 from app.models.user import User
 from app.models.order import Order, OrderStatus
 from app.models.payment import Payment, PaymentStatus, PaymentMethod
+from app.models.reservation import Reservation
 from app.schemas.payment import PaymentCreate, PaymentResponse, PayBoxInitiateResponse, PayBoxCallbackRequest
+from app.services.availability import confirm_order_reservations, cancel_reservations
+from app.services.order_events import publish_order_event
+from app.services.qr_codes import new_pickup_code, qr_code_url
+from app.utils.http_cache import make_etag, is_not_modified, not_modified, cache_headers
 
 router = APIRouter()
 
@@ -144,7 +149,7 @@ async def paybox_callback(
     2. Update payment status
     3. Update order status
     4. Confirm reservations and deduct inventory
-    5. Generate QR code
+    5. Assign pickup code
     """
     # Get form data
     form_data = await request.form()
@@ -198,35 +203,38 @@ async def paybox_callback(
         # Payment successful
         from datetime import datetime
 
+        # Confirm reservations and deduct inventory. Holds released before
+        # the payment arrived are sold again if the portions are still there
+        unavailable = confirm_order_reservations(db, order.id)
+        if unavailable:
+            # Sold out meanwhile: reject the payment so PayBox refunds it
+            payment.status = PaymentStatus.FAILED
+            payment.failure_reason = "Reserved items sold out before payment arrived; refund required"
+            order.status = OrderStatus.CANCELLED
+
+            cancel_reservations(db, Reservation.order_id == order.id)
+            publish_order_event(db, "status", order.id)
+            db.commit()
+
+            return {
+                "pg_status": "rejected",
+                "pg_description": "Ordered items are no longer available"
+            }
+
         payment.status = PaymentStatus.SUCCESS
         payment.paid_at = datetime.utcnow()
 
         # Call order confirmation endpoint logic
         # (This duplicates some logic from orders.py:confirm_order_payment)
-        from app.routers.orders import generate_qr_code
-        from app.models.reservation import Reservation, ReservationStatus
-        from app.models.food import Food
-        import uuid
 
         order.status = OrderStatus.PAID
         order.paid_at = datetime.utcnow()
 
-        # Generate QR code
-        pickup_code = f"ARZAQ-{order.id}-{uuid.uuid4().hex[:8].upper()}"
-        order.pickup_code = pickup_code
-        order.qr_code_path = generate_qr_code(pickup_code)
-
-        # Confirm reservations
-        reservations = db.query(Reservation).filter(
-            Reservation.user_id == order.user_id,
-            Reservation.status == ReservationStatus.ACTIVE
-        ).all()
+        # Assign pickup code; the QR image is rendered on request
+        order.pickup_code = new_pickup_code(order.id)
+        order.qr_code_path = qr_code_url(order.id, order.pickup_code)
 
-        for reservation in reservations:
-            reservation.status = ReservationStatus.CONFIRMED
-            food = db.query(Food).filter(Food.id == reservation.food_id).first()
-            if food:
-                food.quantity -= reservation.quantity
+        publish_order_event(db, "paid", order.id)
 
     else:
         # Payment failed
@@ -234,6 +242,10 @@ async def paybox_callback(
         payment.failure_reason = callback_data.get('pg_failure_description', 'Payment failed')
         order.status = OrderStatus.CANCELLED
 
+        # Release held inventory
+        cancel_reservations(db, Reservation.order_id == order.id)
+        publish_order_event(db, "status", order.id)
+
     db.commit()
 
     # Return success response to PayBox
@@ -246,15 +258,30 @@ async def paybox_callback(
 @router.get("/{order_id}", response_model=PaymentResponse)
 async def get_payment_status(
     order_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get payment status for an order
 
-    Returns payment details and status
+    Returns payment details and status. Supports conditional requests
+    (ETag / Last-Modified): pollers get 304 Not Modified until it changes.
     """
-    payment = db.query(Payment).filter(Payment.order_id == order_id).first()
+    # Only the response columns; skips the raw PayBox payload
+    payment = db.query(
+        Payment.id,
+        Payment.order_id,
+        Payment.user_id,
+        Payment.payment_method,
+        Payment.status,
+        Payment.amount,
+        Payment.paybox_payment_id,
+        Payment.created_at,
+        Payment.updated_at,
+        Payment.paid_at,
+    ).filter(Payment.order_id == order_id).first()
 
     if not payment:
         raise HTTPException(
@@ -269,4 +296,10 @@ async def get_payment_status(
             detail="Not authorized to view this payment"
         )
 
+    etag = make_etag(*payment)
+    last_modified = payment.updated_at or payment.created_at
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    response.headers.update(cache_headers(etag, last_modified))
+
     return payment
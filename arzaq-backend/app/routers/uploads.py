@@ -0,0 +1,35 @@
+# app/routers/uploads.py
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import RedirectResponse
+
+from app.core.config import settings
+from app.services.storage import get_storage
+from app.utils.http_cache import CACHE_CONTROL, IMMUTABLE_CACHE_CONTROL
+from app.utils.static_files import is_immutable_key
+
+router = APIRouter()
+
+
+@router.get("/{key:path}", include_in_schema=False)
+async def get_upload(key: str):
+    """
+    Redirect to a stored upload or QR code (object storage backends)
+
+    Stored URLs keep the /uploads/... form whatever the backend; with
+    STORAGE_BACKEND=s3 this redirects to S3_PUBLIC_URL or a presigned URL.
+    """
+    if not key or ".." in key.split("/"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    # Presigning is local (no request to the bucket)
+    url = get_storage().url(key)
+
+    if not is_immutable_key(key):
+        cache_control = CACHE_CONTROL
+    elif settings.S3_PUBLIC_URL:
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        # The redirect must not outlive the presigned URL
+        cache_control = f"public, max-age={settings.S3_PRESIGN_SECONDS // 2}"
+
+    return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT, headers={"Cache-Control": cache_control})
@@ -1,8 +1,10 @@
 # app/schemas/food.py
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, computed_field, validator
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
+from app.utils.images import variant_urls
+
 
 class FoodBase(BaseModel):
     """Base food schema"""
@@ -38,6 +40,59 @@ class FoodUpdate(BaseModel):
     image: Optional[str] = None
 
 
+class FoodBulkItem(FoodUpdate):
+    """Bulk upsert entry: updates food `id` when given, otherwise creates a food"""
+    id: Optional[int] = None
+
+
+class FoodBulkRequest(BaseModel):
+    """Schema for bulk food upsert"""
+    # Raw entries: each is validated as a FoodBulkItem on its own, so one
+    # invalid entry is reported in the results instead of failing the batch
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=100)
+
+
+class FoodBulkResult(BaseModel):
+    """Outcome of one bulk upsert entry"""
+    index: int  # Position in the request
+    id: Optional[int] = None
+    status: str  # created, updated or failed
+    error: Optional[str] = None
+
+
+class FoodBulkResponse(BaseModel):
+    """Schema for bulk food upsert response"""
+    results: List[FoodBulkResult]
+    created: int
+    updated: int
+    failed: int
+
+
+class FoodImportError(BaseModel):
+    """A rejected row of a menu import"""
+    line: int  # Line number in the uploaded file
+    error: str
+
+
+class FoodImportResponse(BaseModel):
+    """Schema for menu import report"""
+    rows: int  # Data rows read
+    created: int
+    failed: int
+    batches: int  # Committed insert batches
+    errors: List[FoodImportError]
+    errors_truncated: bool  # More rows failed than are listed
+    elapsed_seconds: float
+    rows_per_second: Optional[float]
+
+
+class ImageVariant(BaseModel):
+    """Resized copy of a food image"""
+    width: int  # Pixels; never wider than the original
+    webp: str
+    jpeg: str
+
+
 class FoodResponse(BaseModel):
     """Schema for food item response"""
     id: int
@@ -48,21 +103,29 @@ class FoodResponse(BaseModel):
     old_price: Optional[float]
     discount: Optional[int]
     quantity: int
+    available_quantity: int  # quantity minus reserved portions
     is_available: bool
     expires_at: Optional[datetime]
     restaurant_id: int
     restaurant_name: str  # Computed field
     created_at: datetime
     updated_at: Optional[datetime]
+    distance_km: Optional[float] = None  # Only set by /nearby
+
+    @computed_field
+    @property
+    def image_variants(self) -> Optional[List[ImageVariant]]:
+        """Resized WebP/JPEG copies of an uploaded image (null for external images)"""
+        variants = variant_urls(self.image)
+        return None if variants is None else [ImageVariant(**variant) for variant in variants]
 
     class Config:
         from_attributes = True
 
 
 class FoodListResponse(BaseModel):
-    """Schema for paginated food list"""
+    """Schema for cursor-paginated food list"""
     items: List[FoodResponse]
-    total: int
-    page: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
+    total: Optional[int] = None  # Only computed when include_total=true
     page_size: int
-    pages: int
@@ -53,9 +53,8 @@ class OrderResponse(BaseModel):
 
 
 class OrderListResponse(BaseModel):
-    """Schema for paginated order list"""
+    """Schema for cursor-paginated order list"""
     items: List[OrderResponse]
-    total: int
-    page: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
+    total: Optional[int] = None  # Only computed when include_total=true
     page_size: int
-    pages: int
@@ -0,0 +1,369 @@
+from sqlalchemy import case, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, Optional, Set
+from collections import defaultdict
+from datetime import datetime
+
+from app.models.food import Food
+from app.models.order import Order, OrderItem
+from app.models.reservation import Reservation, ReservationStatus
+from app.services.catalog_cache import invalidate_catalog
+from app.services.food_events import publish_food_events
+
+# Inventory accounting
+#
+# foods.reserved_quantity is a denormalized counter equal to the sum of
+# ACTIVE reservations for the food. Every change goes through a single
+# conditional UPDATE, so concurrent checkouts never oversell:
+#
+#   reserve  -> reserved_quantity += n   (only if quantity - reserved >= n)
+#   confirm  -> quantity -= n, reserved_quantity -= n
+#   sell     -> quantity -= n            (no hold; only if quantity - reserved >= n)
+#   expire   -> reserved_quantity -= n
+#   cancel   -> reserved_quantity -= n
+#
+# Each change drops this worker's cached catalog entries for the foods
+# and sends a "stock" event to the live feed once the transaction commits
+# (see invalidate_catalog and publish_food_events).
+
+
+def not_expired():
+    """Condition for foods whose pickup deadline has not passed"""
+    return or_(Food.expires_at.is_(None), Food.expires_at > func.now())
+
+
+def _per_food(quantities: Dict[int, int]):
+    """Build a CASE expression mapping Food.id to its quantity delta"""
+    return case(quantities, value=Food.id, else_=0)
+
+
+def reserve(db: Session, quantities: Dict[int, int]) -> Set[int]:
+    """
+    Atomically reserve portions for several foods in one statement
+
+    Each food is only updated if it is available, not past its pickup
+    deadline and still has enough unreserved portions. The caller must roll back the transaction when
+    any food could not be reserved.
+
+    Args:
+        db: Database session
+        quantities: Mapping of food_id -> portions to reserve
+
+    Returns:
+        IDs of foods that could NOT be reserved (empty on success)
+    """
+    if not quantities:
+        return set()
+
+    delta = _per_food(quantities)
+
+    reserved_ids = db.execute(
+        update(Food)
+        .where(
+            Food.id.in_(quantities.keys()),
+            Food.is_available == True,
+            not_expired(),
+            Food.quantity - Food.reserved_quantity >= delta,
+        )
+        .values(reserved_quantity=Food.reserved_quantity + delta)
+        .returning(Food.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+    invalidate_catalog(db, food_ids=reserved_ids, shared=False)
+    publish_food_events(db, "stock", reserved_ids)
+
+    return set(quantities.keys()) - set(reserved_ids)
+
+
+def release(db: Session, quantities: Dict[int, int]) -> None:
+    """
+    Return reserved portions to the pool (expired or cancelled reservations)
+
+    Args:
+        db: Database session
+        quantities: Mapping of food_id -> portions to release
+    """
+    if not quantities:
+        return
+
+    delta = _per_food(quantities)
+
+    # Never let the counter drop below zero
+    db.execute(
+        update(Food)
+        .where(Food.id.in_(quantities.keys()))
+        .values(
+            reserved_quantity=case(
+                (Food.reserved_quantity > delta, Food.reserved_quantity - delta),
+                else_=0,
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    invalidate_catalog(db, food_ids=quantities.keys(), shared=False)
+    publish_food_events(db, "stock", quantities.keys())
+
+
+def commit_reserved(db: Session, quantities: Dict[int, int]) -> None:
+    """
+    Turn reserved portions into sold portions (payment confirmed)
+
+    Args:
+        db: Database session
+        quantities: Mapping of food_id -> portions sold
+    """
+    if not quantities:
+        return
+
+    delta = _per_food(quantities)
+
+    db.execute(
+        update(Food)
+        .where(Food.id.in_(quantities.keys()))
+        .values(
+            quantity=Food.quantity - delta,
+            reserved_quantity=Food.reserved_quantity - delta,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    invalidate_catalog(db, food_ids=quantities.keys(), shared=False)
+    publish_food_events(db, "stock", quantities.keys())
+
+
+def sell(db: Session, quantities: Dict[int, int]) -> Set[int]:
+    """
+    Atomically sell unreserved portions for several foods in one statement
+
+    Same conditions as reserve(), for portions that have no hold (payment
+    arrived after the hold was released). Foods that cannot be sold are
+    left untouched.
+
+    Returns:
+        IDs of foods that could NOT be sold (empty on success)
+    """
+    if not quantities:
+        return set()
+
+    delta = _per_food(quantities)
+
+    sold_ids = db.execute(
+        update(Food)
+        .where(
+            Food.id.in_(quantities.keys()),
+            Food.is_available == True,
+            not_expired(),
+            Food.quantity - Food.reserved_quantity >= delta,
+        )
+        .values(quantity=Food.quantity - delta)
+        .returning(Food.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+    invalidate_catalog(db, food_ids=sold_ids, shared=False)
+    publish_food_events(db, "stock", sold_ids)
+
+    return set(quantities.keys()) - set(sold_ids)
+
+
+def _close_reservations(db: Session, new_status: ReservationStatus, *criteria) -> Dict[int, int]:
+    """
+    Move matching ACTIVE reservations to new_status
+
+    Returns:
+        Mapping of food_id -> total portions that changed status
+    """
+    rows = db.execute(
+        update(Reservation)
+        .where(Reservation.status == ReservationStatus.ACTIVE, *criteria)
+        .values(status=new_status)
+        .returning(Reservation.food_id, Reservation.quantity)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    totals = defaultdict(int)
+    for food_id, quantity in rows:
+        totals[food_id] += quantity
+
+    return dict(totals)
+
+
+def confirm_reservations(db: Session, *criteria) -> Dict[int, int]:
+    """Confirm matching ACTIVE reservations and deduct sold inventory"""
+    totals = _close_reservations(db, ReservationStatus.CONFIRMED, *criteria)
+    commit_reserved(db, totals)
+    return totals
+
+
+def _unheld_portions(db: Session, order_id: int) -> Dict[int, int]:
+    """Portions of an order's items not covered by ACTIVE or CONFIRMED reservations"""
+    held = (
+        select(func.coalesce(func.sum(Reservation.quantity), 0))
+        .where(
+            Reservation.order_id == order_id,
+            Reservation.food_id == OrderItem.food_id,
+            Reservation.status.in_((ReservationStatus.ACTIVE, ReservationStatus.CONFIRMED)),
+        )
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        select(OrderItem.food_id, func.sum(OrderItem.quantity) - held)
+        .where(OrderItem.order_id == order_id)
+        .group_by(OrderItem.food_id)
+    ).all()
+
+    return {food_id: missing for food_id, missing in rows if missing > 0}
+
+
+def _sell_unheld_portions(db: Session, order_id: int) -> Set[int]:
+    """
+    Sell the portions of an order whose holds were released before payment
+
+    Holds can be released before the payment callback arrives (reservation
+    reaper, checkout cleanup, food expiry sweeper), and their portions may
+    have been reserved by someone else since. Sold portions are recorded as
+    CONFIRMED reservations of the order, like the ones held at checkout.
+
+    Returns:
+        IDs of foods that are no longer available; nothing was sold then
+    """
+    missing = _unheld_portions(db, order_id)
+    if not missing:
+        return set()
+
+    unavailable = sell(db, missing)
+    if unavailable:
+        # Put back what the UPDATE did sell (its rows are still locked)
+        sold = {food_id: quantity for food_id, quantity in missing.items() if food_id not in unavailable}
+        if sold:
+            delta = _per_food(sold)
+            db.execute(
+                update(Food)
+                .where(Food.id.in_(sold.keys()))
+                .values(quantity=Food.quantity + delta)
+                .execution_options(synchronize_session=False)
+            )
+        return unavailable
+
+    user_id = db.scalar(select(Order.user_id).where(Order.id == order_id))
+    now = datetime.utcnow()
+    db.execute(
+        insert(Reservation),
+        [
+            {
+                "user_id": user_id,
+                "food_id": food_id,
+                "order_id": order_id,
+                "quantity": quantity,
+                "status": ReservationStatus.CONFIRMED,
+                "expires_at": now,
+            }
+            for food_id, quantity in missing.items()
+        ],
+    )
+    return set()
+
+
+def confirm_order_reservations(db: Session, order_id: int) -> Set[int]:
+    """
+    Confirm an order's reservations and deduct sold inventory (payment received)
+
+    Portions whose holds were already released are sold again if they are
+    still available. If any of them is not, nothing is changed: the caller
+    must not mark the order paid (cancel it and refund the payment).
+
+    On Postgres confirming the held portions is a single statement: the
+    reservation UPDATE runs in a CTE and foods are decremented by joining
+    against what it returned.
+
+    Returns:
+        IDs of foods that could not be sold (empty on success)
+    """
+    unavailable = _sell_unheld_portions(db, order_id)
+    if unavailable:
+        return unavailable
+
+    if db.get_bind().dialect.name != "postgresql":
+        confirm_reservations(db, Reservation.order_id == order_id)
+        return set()
+
+    confirmed = (
+        update(Reservation)
+        .where(
+            Reservation.order_id == order_id,
+            Reservation.status == ReservationStatus.ACTIVE,
+        )
+        .values(status=ReservationStatus.CONFIRMED)
+        .returning(Reservation.food_id, Reservation.quantity)
+        .cte("confirmed")
+    )
+    sold = (
+        select(confirmed.c.food_id, func.sum(confirmed.c.quantity).label("quantity"))
+        .group_by(confirmed.c.food_id)
+        .subquery("sold")
+    )
+
+    sold_ids = db.execute(
+        update(Food)
+        .where(Food.id == sold.c.food_id)
+        .values(
+            quantity=Food.quantity - sold.c.quantity,
+            reserved_quantity=Food.reserved_quantity - sold.c.quantity,
+        )
+        .returning(Food.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+    invalidate_catalog(db, food_ids=sold_ids, shared=False)
+    publish_food_events(db, "stock", sold_ids)
+    return set()
+
+
+def cancel_reservations(db: Session, *criteria) -> Dict[int, int]:
+    """Cancel matching ACTIVE reservations and release their portions"""
+    totals = _close_reservations(db, ReservationStatus.CANCELLED, *criteria)
+    release(db, totals)
+    return totals
+
+
+def expire_reservations(
+    db: Session,
+    food_ids: Optional[Iterable[int]] = None,
+    reservation_ids: Optional[Iterable[int]] = None,
+) -> Dict[int, int]:
+    """
+    Expire ACTIVE reservations past their deadline and release their portions
+
+    Args:
+        db: Database session
+        food_ids: Restrict to these foods (default: all foods)
+        reservation_ids: Restrict to these reservations (default: all)
+
+    Returns:
+        Mapping of food_id -> portions released
+    """
+    criteria = [Reservation.expires_at <= datetime.utcnow()]
+    if food_ids is not None:
+        criteria.append(Reservation.food_id.in_(set(food_ids)))
+    if reservation_ids is not None:
+        criteria.append(Reservation.id.in_(set(reservation_ids)))
+
+    totals = _close_reservations(db, ReservationStatus.EXPIRED, *criteria)
+    release(db, totals)
+    return totals
+
+
+def release_food_reservations(db: Session, food_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Expire every ACTIVE reservation of the given foods, whatever its deadline
+
+    Used when the foods themselves are retired (pickup deadline passed).
+
+    Returns:
+        Mapping of food_id -> portions released
+    """
+    totals = _close_reservations(db, ReservationStatus.EXPIRED, Reservation.food_id.in_(set(food_ids)))
+    release(db, totals)
+    return totals
@@ -0,0 +1,156 @@
+from datetime import datetime
+from typing import List, Sequence
+
+from pydantic import ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.models.food import Food
+from app.schemas.food import FoodBulkItem, FoodCreate
+from app.services.catalog_cache import invalidate_catalog
+from app.services.food_events import publish_food_events
+
+# Columns an update may not set to null
+NOT_NULL_FIELDS = ("name", "price", "quantity", "is_available")
+
+
+def format_validation_error(exc: ValidationError) -> str:
+    """One-line summary of a pydantic validation error"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+def food_row(restaurant_id: int, food: FoodCreate, is_available: bool = True) -> dict:
+    """Column values for inserting a validated food"""
+    row = food.model_dump()
+    row.update(
+        restaurant_id=restaurant_id,
+        is_available=is_available,
+        discount=Food.compute_discount(food.price, food.old_price),
+    )
+    return row
+
+
+def insert_food_rows(db: Session, rows: List[dict]) -> List[int]:
+    """
+    Insert foods with one bulk INSERT ... RETURNING
+
+    Returns:
+        New food ids, in the order of rows
+    """
+    return db.execute(
+        insert(Food).returning(Food.id, sort_by_parameter_order=True),
+        rows,
+    ).scalars().all()
+
+
+def upsert_foods(db: Session, restaurant_id: int, items: Sequence[dict]) -> List[dict]:
+    """
+    Create and update many foods of a restaurant with one statement each
+
+    Invalid entries (schema or business rules) are reported and skipped;
+    valid ones are written with a single bulk INSERT and a single bulk
+    UPDATE. The caller commits.
+
+    Args:
+        db: Database session
+        restaurant_id: Restaurant owning the foods
+        items: Raw entries (validated here as FoodBulkItem, one by one);
+            entries with an id update that food
+
+    Returns:
+        One result dict per entry (index, id, status, error), in input order
+    """
+    results = [None] * len(items)
+    creates = []  # (index, row)
+    updates = {}  # food_id -> (index, changes)
+    now = datetime.utcnow()
+
+    parsed = []  # (index, item)
+    for index, raw in enumerate(items):
+        try:
+            parsed.append((index, FoodBulkItem.model_validate(raw)))
+        except ValidationError as exc:
+            food_id = raw.get("id") if isinstance(raw, dict) and isinstance(raw.get("id"), int) else None
+            results[index] = _failed(index, food_id, format_validation_error(exc))
+
+    # Lock the foods being updated: reserved_quantity must not grow
+    # between the checks below and the UPDATE
+    update_ids = {item.id for _, item in parsed if item.id is not None}
+    existing = {}
+    if update_ids:
+        rows = (
+            db.query(Food.id, Food.restaurant_id, Food.price, Food.old_price, Food.reserved_quantity)
+            .filter(Food.id.in_(update_ids))
+            .with_for_update()
+            .all()
+        )
+        existing = {row.id: row for row in rows}
+
+    for index, item in parsed:
+        if item.id is None:
+            try:
+                food = FoodCreate.model_validate(item.model_dump(exclude={"id", "is_available"}, exclude_unset=True))
+            except ValidationError as exc:
+                results[index] = _failed(index, None, format_validation_error(exc))
+                continue
+
+            is_available = item.is_available if item.is_available is not None else True
+            creates.append((index, food_row(restaurant_id, food, is_available)))
+            continue
+
+        changes = item.model_dump(exclude={"id"}, exclude_unset=True)
+        current = existing.get(item.id)
+
+        if current is None:
+            error = "Food item not found"
+        elif current.restaurant_id != restaurant_id:
+            error = "Not authorized to update this food item"
+        elif item.id in updates:
+            error = "Food item appears more than once"
+        elif any(field in changes and changes[field] is None for field in NOT_NULL_FIELDS):
+            error = f"Cannot clear required fields: {', '.join(NOT_NULL_FIELDS)}"
+        elif changes.get("quantity") is not None and changes["quantity"] < current.reserved_quantity:
+            error = f"Quantity cannot be lower than reserved portions ({current.reserved_quantity})"
+        else:
+            error = None
+
+        if error:
+            results[index] = _failed(index, item.id, error)
+            continue
+
+        changes.update(
+            id=item.id,
+            discount=Food.compute_discount(
+                changes.get("price", current.price),
+                changes.get("old_price", current.old_price),
+            ),
+            updated_at=now,
+        )
+        updates[item.id] = (index, changes)
+
+    if creates:
+        new_ids = insert_food_rows(db, [row for _, row in creates])
+        publish_food_events(db, "created", new_ids)
+
+        for (index, _), food_id in zip(creates, new_ids):
+            results[index] = {"index": index, "id": food_id, "status": "created", "error": None}
+
+    if updates:
+        # ORM bulk UPDATE by primary key (executemany)
+        db.execute(update(Food), [changes for _, changes in updates.values()])
+        publish_food_events(db, "updated", updates.keys())
+
+        for food_id, (index, _) in updates.items():
+            results[index] = {"index": index, "id": food_id, "status": "updated", "error": None}
+
+    if creates or updates:
+        invalidate_catalog(db, restaurant_ids=[restaurant_id], food_ids=updates.keys())
+
+    return results
+
+
+def _failed(index: int, food_id, error: str) -> dict:
+    return {"index": index, "id": food_id, "status": "failed", "error": error}
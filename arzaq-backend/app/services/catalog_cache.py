@@ -0,0 +1,192 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.catalog import CatalogVersion
+from app.utils.cache import TTLCache, MISSING
+from app.utils.http_cache import make_etag
+
+GLOBAL_SCOPE = "global"
+
+# Session.info key holding invalidations to apply once the transaction commits
+_PENDING_KEY = "catalog_invalidations"
+
+
+def restaurant_scope(restaurant_id: int) -> str:
+    return f"restaurant:{restaurant_id}"
+
+
+class CatalogCache:
+    """
+    LRU+TTL cache of serialized public catalog responses
+
+    Keys embed the version stamp of their scope (see CatalogVersion), so
+    a catalog write committed by any worker makes older entries
+    unreachable on every worker. Stamps are re-read from the database at
+    most once per CATALOG_VERSION_CHECK_SECONDS per scope.
+
+    Entries are also tagged with the restaurants and foods they contain,
+    which lets the local worker drop them as soon as it commits a write.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float, version_check_seconds: float):
+        self.entries = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self.version_check_seconds = version_check_seconds
+        self._versions: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def version(self, db: Session, scope: str) -> int:
+        """Current version stamp of a scope (0 if it was never bumped)"""
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._versions.get(scope)
+        if cached is not None and now - cached[1] < self.version_check_seconds:
+            return cached[0]
+
+        version = db.query(CatalogVersion.version).filter(CatalogVersion.scope == scope).scalar() or 0
+
+        with self._lock:
+            self._versions[scope] = (version, now)
+        return version
+
+    def key(self, db: Session, scope: str, *params: Hashable) -> tuple:
+        """
+        Cache key for a response in scope, stamped with the scope's version
+
+        Take the key before querying, so data read concurrently with a
+        write is never stored under the post-write version.
+        """
+        return (scope, self.version(db, scope)) + params
+
+    def etag(self, key: tuple) -> str:
+        """
+        ETag of the response cached under key, known before it is built
+
+        Derived from the key (version stamp and request parameters) rather
+        than the body, so a revalidation is answered before any query and
+        every worker gives the same answer. Checkout paths change stock
+        without bumping the stamp, so the tag also rolls over every
+        CATALOG_CACHE_TTL_SECONDS: clients never keep a page longer than
+        a worker would.
+        """
+        window = int(time.time() // self.entries.ttl_seconds)
+        return make_etag(*key, window)
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        """Cached payload for key, or None if missing or expired"""
+        payload = self.entries.get(key)
+        return None if payload is MISSING else payload
+
+    def set(
+        self,
+        key: tuple,
+        payload: bytes,
+        tags: Iterable[str],
+        expires_at: Iterable[Optional[datetime]] = (),
+    ):
+        """
+        Store a serialized response
+
+        Args:
+            expires_at: Pickup deadlines of the foods in the payload; the
+                entry is dropped when the first one passes
+        """
+        deadlines = [
+            value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+            for value in expires_at if value is not None
+        ]
+        ttl = None
+        if deadlines:
+            ttl = max(0.0, (min(deadlines) - datetime.now(timezone.utc)).total_seconds())
+
+        self.entries.set(key, payload, tags, ttl_seconds=ttl)
+
+    def invalidate(self, restaurant_ids: Iterable[int] = (), food_ids: Iterable[int] = ()):
+        """
+        Drop local entries for the given restaurants and foods
+
+        Listings without a restaurant filter are dropped whenever a
+        restaurant is given, since a new or removed food may appear on them.
+        """
+        restaurant_ids = set(restaurant_ids)
+        tags = [f"food:{food_id}" for food_id in food_ids]
+        tags += [restaurant_scope(restaurant_id) for restaurant_id in restaurant_ids]
+        if restaurant_ids:
+            tags.append(GLOBAL_SCOPE)
+
+        self.entries.invalidate_tags(tags)
+
+        # Force a fresh stamp read so this worker sees its own bump at once
+        with self._lock:
+            self._versions.clear()
+
+    def stats(self) -> dict:
+        return self.entries.stats()
+
+
+catalog_cache = CatalogCache(
+    maxsize=settings.CATALOG_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+    version_check_seconds=settings.CATALOG_VERSION_CHECK_SECONDS,
+)
+
+
+def invalidate_catalog(
+    db: Session,
+    restaurant_ids: Iterable[int] = (),
+    food_ids: Iterable[int] = (),
+    shared: bool = True,
+):
+    """
+    Invalidate cached catalog responses once the current transaction commits
+
+    Args:
+        db: Session running the write
+        restaurant_ids: Restaurants whose listings changed
+        food_ids: Foods whose payload changed
+        shared: Also bump the version stamps so every worker drops its
+            entries. Checkout paths pass False: bumping shared rows there
+            would serialize concurrent checkouts, and availability on
+            other workers is only stale for CATALOG_CACHE_TTL_SECONDS.
+    """
+    restaurant_ids = set(restaurant_ids)
+    food_ids = set(food_ids)
+
+    if shared and (restaurant_ids or food_ids):
+        _bump_versions(db, [GLOBAL_SCOPE] + [restaurant_scope(rid) for rid in restaurant_ids])
+
+    pending = db.info.setdefault(_PENDING_KEY, (set(), set()))
+    pending[0].update(restaurant_ids)
+    pending[1].update(food_ids)
+
+
+def _bump_versions(db: Session, scopes):
+    """Increment version stamps, creating missing rows (single statement)"""
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = insert(CatalogVersion).values([{"scope": scope, "version": 1} for scope in scopes])
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[CatalogVersion.scope],
+            set_={"version": CatalogVersion.version + 1},
+        )
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_invalidations(session: Session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        catalog_cache.invalidate(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session: Session):
+    session.info.pop(_PENDING_KEY, None)
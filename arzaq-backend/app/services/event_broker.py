@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+from typing import Iterable, List, Optional, Set
+
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads must stay below 8000 bytes
+MAX_NOTIFY_PAYLOAD = 7500
+
+
+class Subscription:
+    """One connected client: a bounded queue plus its filters"""
+
+    def __init__(self, restaurant_id: Optional[int], cells: Optional[List[str]], queue_size: int):
+        self.restaurant_id = restaurant_id
+        self.cells = tuple(cells) if cells else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def matches(self, event: dict) -> bool:
+        if self.restaurant_id is not None and event["restaurant_id"] != self.restaurant_id:
+            return False
+        if self.cells is not None and not (event.get("geohash") or "").startswith(self.cells):
+            return False
+        return True
+
+
+class EventBroker:
+    """
+    In-process pub/sub of live events (food feed, restaurant order queues)
+
+    Subscriptions live on the event loop; publish() may be called from any
+    thread. A client whose queue fills up (it stopped reading) is dropped
+    with a None marker, so one slow reader never holds back the others.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscriptions: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        """Bind the broker to the running event loop"""
+        self._loop = asyncio.get_running_loop()
+
+    def stop(self):
+        """Close every stream"""
+        for subscription in list(self._subscriptions):
+            self._drop(subscription)
+        self._loop = None
+
+    def subscribe(self, restaurant_id: Optional[int] = None, cells: Optional[List[str]] = None) -> Subscription:
+        subscription = Subscription(restaurant_id, cells, self.queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscriptions.discard(subscription)
+
+    def publish(self, events: List[dict]):
+        """Fan events out to matching subscribers (thread-safe)"""
+        loop = self._loop
+        if loop is None or not events:
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, events)
+        except RuntimeError:
+            # Loop already closed (shutdown)
+            pass
+
+    def _deliver(self, events: List[dict]):
+        for subscription in list(self._subscriptions):
+            for event in events:
+                if not subscription.matches(event):
+                    continue
+                try:
+                    subscription.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    self._drop(subscription)
+                    break
+
+    def _drop(self, subscription: Subscription):
+        self._subscriptions.discard(subscription)
+        # Make room for the end-of-stream marker
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+
+class PostgresEventBridge:
+    """
+    Relays NOTIFY payloads from Postgres to the local broker
+
+    Holds one dedicated LISTEN connection (outside the pool) per worker and
+    waits on its socket with the event loop, so it costs nothing between
+    notifications. The connection is re-opened after errors.
+    """
+
+    def __init__(self, broker: EventBroker, channel: str, reconnect_seconds: float):
+        self.broker = broker
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connection = None
+        self._retry: Optional[asyncio.TimerHandle] = None
+
+    def start(self):
+        """Start listening on the running event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._connect()
+
+    def stop(self):
+        """Stop listening and close the connection"""
+        if self._retry is not None:
+            self._retry.cancel()
+            self._retry = None
+        self._close()
+        self._loop = None
+
+    def _connect(self):
+        self._retry = None
+        try:
+            pooled = engine.raw_connection()
+            connection = pooled.dbapi_connection
+            pooled.detach()
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+        except Exception:
+            logger.exception(f"Could not listen on {self.channel}")
+            self._schedule_reconnect()
+            return
+
+        self._connection = connection
+        self._loop.add_reader(connection.fileno(), self._on_readable)
+
+    def _on_readable(self):
+        try:
+            self._connection.poll()
+        except Exception:
+            logger.exception(f"Lost the {self.channel} connection")
+            self._close()
+            self._schedule_reconnect()
+            return
+
+        events = []
+        while self._connection.notifies:
+            notification = self._connection.notifies.pop(0)
+            try:
+                events.extend(json.loads(notification.payload))
+            except ValueError:
+                logger.warning(f"Ignoring malformed {self.channel} payload: {notification.payload[:200]}")
+
+        self.broker.publish(events)
+
+    def _close(self):
+        if self._connection is None:
+            return
+        try:
+            self._loop.remove_reader(self._connection.fileno())
+        except Exception:
+            pass
+        try:
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+    def _schedule_reconnect(self):
+        if self._loop is not None:
+            self._retry = self._loop.call_later(self.reconnect_seconds, self._connect)
+
+
+def notify_payloads(events: List[dict]) -> Iterable[str]:
+    """JSON arrays of events, each small enough for one NOTIFY"""
+    chunk, size = [], 2
+    for event in events:
+        encoded = json.dumps(event, separators=(",", ":"))
+        if chunk and size + len(encoded) + 1 > MAX_NOTIFY_PAYLOAD:
+            yield "[" + ",".join(chunk) + "]"
+            chunk, size = [], 2
+        chunk.append(encoded)
+        size += len(encoded) + 1
+
+    if chunk:
+        yield "[" + ",".join(chunk) + "]"
+
+
+def format_sse(event_name: str, data: dict) -> str:
+    return f"event: {event_name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
@@ -0,0 +1,160 @@
+import asyncio
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.food import Food
+from app.models.user import User
+from app.services.event_broker import EventBroker, PostgresEventBridge, format_sse, notify_payloads
+
+# Postgres NOTIFY channel shared by all replicas
+CHANNEL = "food_events"
+
+# Event types, most significant first: when one transaction touches a
+# food several times, only the most significant event is sent
+EVENT_TYPES = ("deleted", "created", "updated", "stock")
+
+# Session.info keys: changes recorded during the transaction, and events
+# built from them waiting for the commit
+_PENDING_KEY = "food_events"
+_READY_KEY = "food_events_ready"
+
+food_event_broker = EventBroker(queue_size=settings.FOOD_EVENTS_QUEUE_SIZE)
+food_event_bridge = PostgresEventBridge(food_event_broker, CHANNEL, settings.FOOD_EVENTS_RECONNECT_SECONDS)
+
+
+def start_food_events():
+    """Start the broker, plus the cross-replica bridge on Postgres"""
+    food_event_broker.start()
+    if engine.dialect.name == "postgresql":
+        food_event_bridge.start()
+
+
+def stop_food_events():
+    food_event_bridge.stop()
+    food_event_broker.stop()
+
+
+def publish_food_events(
+    db: Session,
+    event_type: str,
+    food_ids: Iterable[int],
+    restaurant_id: Optional[int] = None,
+):
+    """
+    Send food events once the current transaction commits
+
+    Args:
+        db: Session running the write
+        event_type: One of EVENT_TYPES
+        food_ids: Foods that changed
+        restaurant_id: Owner of the foods; required for "deleted", whose
+            rows are gone by commit time
+    """
+    pending: Dict[int, tuple] = db.info.setdefault(_PENDING_KEY, {})
+    rank = EVENT_TYPES.index(event_type)
+
+    for food_id in food_ids:
+        current = pending.get(food_id)
+        if current is None or rank < EVENT_TYPES.index(current[0]):
+            pending[food_id] = (event_type, restaurant_id)
+
+
+def _build_events(session: Session, pending: Dict[int, tuple]) -> List[dict]:
+    """Compact event dicts with the committed state of each food"""
+    events = []
+
+    live = [food_id for food_id, (event_type, _) in pending.items() if event_type != "deleted"]
+    if live:
+        rows = session.execute(
+            select(Food.id, Food.restaurant_id, Food.quantity, Food.reserved_quantity, Food.is_available, User.geohash)
+            .join(User, Food.restaurant_id == User.id)
+            .where(Food.id.in_(live))
+        ).all()
+        for food_id, restaurant_id, quantity, reserved, is_available, cell in rows:
+            events.append({
+                "type": pending[food_id][0],
+                "id": food_id,
+                "restaurant_id": restaurant_id,
+                "geohash": cell,
+                "available_quantity": max(quantity - reserved, 0),
+                "is_available": is_available,
+            })
+
+    deleted = {food_id: restaurant_id for food_id, (event_type, restaurant_id) in pending.items() if event_type == "deleted"}
+    if deleted:
+        cells = dict(session.execute(select(User.id, User.geohash).where(User.id.in_(set(deleted.values())))).all())
+        for food_id, restaurant_id in deleted.items():
+            events.append({
+                "type": "deleted",
+                "id": food_id,
+                "restaurant_id": restaurant_id,
+                "geohash": cells.get(restaurant_id),
+            })
+
+    return events
+
+
+@event.listens_for(Session, "before_commit")
+def _prepare_food_events(session: Session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    # before_commit runs ahead of the final flush; read the state being committed
+    session.flush()
+    events = _build_events(session, pending)
+    if session.get_bind().dialect.name == "postgresql":
+        # Delivered by Postgres on commit, to every replica including this one
+        for payload in notify_payloads(events):
+            session.execute(select(func.pg_notify(CHANNEL, payload)))
+    else:
+        session.info[_READY_KEY] = events
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_food_events(session: Session):
+    events = session.info.pop(_READY_KEY, None)
+    if events:
+        food_event_broker.publish(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_food_events(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_READY_KEY, None)
+
+
+async def stream_food_events(
+    restaurant_id: Optional[int],
+    cells: Optional[List[str]],
+    keepalive_seconds: float,
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for one subscriber until the client goes away
+
+    Emits "food.<type>" events, a comment line on idle streams and a final
+    "overflow" event if the client fell too far behind (it should reload
+    the catalog and reconnect). The subscription only exists while the
+    generator runs, so a response that is never streamed cannot leak one.
+    """
+    subscription = food_event_broker.subscribe(restaurant_id=restaurant_id, cells=cells)
+    try:
+        yield f"retry: {settings.FOOD_EVENTS_RECONNECT_SECONDS * 1000}\n\n"
+        while True:
+            try:
+                food_event = await asyncio.wait_for(subscription.queue.get(), keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if food_event is None:
+                yield format_sse("overflow", {})
+                return
+
+            yield format_sse(f"food.{food_event['type']}", food_event)
+    finally:
+        food_event_broker.unsubscribe(subscription)
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import func, select, update
+
+from app.core.config import settings
+from app.core.database import SessionLocal, try_advisory_lock
+from app.models.food import Food
+from app.services.availability import release_food_reservations
+from app.services.catalog_cache import invalidate_catalog
+from app.services.food_events import publish_food_events
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock key shared by all replicas ("ARZQ" + 2)
+SWEEPER_LOCK_KEY = 0x41525A51_0002
+
+
+class FoodExpirySweeper:
+    """
+    Background job that retires foods past their pickup deadline
+
+    Each tick flips is_available off for a batch of expired foods with one
+    UPDATE, expires their ACTIVE reservations (returning the held portions)
+    and invalidates the cached catalog once for the whole batch.
+
+    Only one replica sweeps at a time (Postgres advisory lock per tick).
+    """
+
+    def __init__(self, interval_seconds: int, batch_size: int):
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the sweeper loop on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the sweeper loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                # Keep going while a full batch was retired (backlog)
+                while await asyncio.to_thread(self.tick) >= self.batch_size:
+                    pass
+            except Exception:
+                logger.exception("Food expiry sweep failed")
+
+            await asyncio.sleep(self.interval_seconds)
+
+    def tick(self) -> int:
+        """
+        Retire one batch of expired foods
+
+        Returns:
+            Number of foods retired
+        """
+        db = SessionLocal()
+        try:
+            if not try_advisory_lock(db, SWEEPER_LOCK_KEY):
+                return 0
+
+            # Rows locked by in-flight checkouts are picked up next tick
+            expired = (
+                select(Food.id)
+                .where(Food.is_available == True, Food.expires_at <= func.now())
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = db.execute(
+                update(Food)
+                .where(Food.id.in_(expired.scalar_subquery()))
+                .values(is_available=False, updated_at=func.now())
+                .returning(Food.id, Food.restaurant_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+
+            if rows:
+                food_ids = [food_id for food_id, _ in rows]
+                released = release_food_reservations(db, food_ids)
+                invalidate_catalog(db, restaurant_ids={restaurant_id for _, restaurant_id in rows}, food_ids=food_ids)
+                publish_food_events(db, "updated", food_ids)
+                logger.info(f"Retired {len(rows)} expired foods, released {sum(released.values())} portions")
+
+            db.commit()
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+food_expiry_sweeper = FoodExpirySweeper(
+    interval_seconds=settings.FOOD_EXPIRY_SWEEP_INTERVAL_SECONDS,
+    batch_size=settings.FOOD_EXPIRY_SWEEP_BATCH_SIZE,
+)
@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+import logging
+import time
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.schemas.food import FoodCreate
+from app.services.bulk_foods import food_row, format_validation_error, insert_food_rows
+from app.services.catalog_cache import invalidate_catalog
+from app.services.food_events import publish_food_events
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+
+class ImportAborted(Exception):
+    """The file cannot be read any further (bad encoding, broken CSV)"""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(message)
+        self.line = line
+
+
+def iter_records(binary_file: BinaryIO, file_format: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Stream records from a CSV or JSONL file, one at a time
+
+    Args:
+        binary_file: File opened in binary mode
+        file_format: "csv" (header row required) or "jsonl"
+
+    Yields:
+        (line number, record or None, parse error or None)
+
+    Raises:
+        ImportAborted: If the rest of the file cannot be parsed
+    """
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    line = 0
+
+    try:
+        if file_format == "csv":
+            reader = csv.DictReader(text)
+            if reader.fieldnames:
+                reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+
+            for record in reader:
+                line = reader.line_num
+                yield line, record, None
+        else:
+            for line, raw in enumerate(text, start=1):
+                if not raw.strip():
+                    continue
+                try:
+                    record = json.loads(raw)
+                except json.JSONDecodeError as exc:
+                    yield line, None, f"Invalid JSON: {exc.msg}"
+                    continue
+                if not isinstance(record, dict):
+                    yield line, None, "Expected a JSON object"
+                    continue
+                yield line, record, None
+    except UnicodeDecodeError:
+        raise ImportAborted(line + 1, "File is not valid UTF-8")
+    except csv.Error as exc:
+        raise ImportAborted(line + 1, f"Invalid CSV: {exc}")
+    finally:
+        # Leave the underlying upload file open for its owner
+        text.detach()
+
+
+def import_foods(db: Session, restaurant_id: int, binary_file: BinaryIO, file_format: str) -> dict:
+    """
+    Validate and insert foods from a CSV/JSONL file in committed batches
+
+    Rows are validated against FoodCreate one by one and inserted
+    FOOD_IMPORT_BATCH_SIZE at a time (one INSERT and one commit per batch),
+    so memory use and transaction size do not grow with the file.
+
+    Args:
+        db: Database session
+        restaurant_id: Restaurant owning the new foods
+        binary_file: Uploaded file, opened in binary mode
+        file_format: "csv" or "jsonl"
+
+    Returns:
+        Import report matching FoodImportResponse
+    """
+    started = time.perf_counter()
+    report = {"rows": 0, "created": 0, "failed": 0, "batches": 0, "errors": [], "errors_truncated": False}
+    batch: List[Tuple[int, dict]] = []
+
+    def record_error(line: int, error: str):
+        report["failed"] += 1
+        if len(report["errors"]) < settings.FOOD_IMPORT_MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line, "error": error})
+        else:
+            report["errors_truncated"] = True
+
+    def flush():
+        try:
+            food_ids = insert_food_rows(db, [row for _, row in batch])
+            invalidate_catalog(db, restaurant_ids=[restaurant_id])
+            publish_food_events(db, "created", food_ids)
+            db.commit()
+            report["created"] += len(batch)
+        except SQLAlchemyError:
+            db.rollback()
+            logger.exception("Food import batch failed")
+            for line, _ in batch:
+                record_error(line, "Could not be saved")
+        report["batches"] += 1
+        batch.clear()
+
+    try:
+        for line, record, parse_error in iter_records(binary_file, file_format):
+            if report["rows"] >= settings.FOOD_IMPORT_MAX_ROWS:
+                record_error(line, f"Row limit reached ({settings.FOOD_IMPORT_MAX_ROWS}); rest of file skipped")
+                break
+
+            report["rows"] += 1
+            if parse_error:
+                record_error(line, parse_error)
+                continue
+
+            # Empty CSV cells mean "not provided"
+            record = {key: value for key, value in record.items() if key and value not in ("", None)}
+
+            try:
+                food = FoodCreate.model_validate(record)
+            except ValidationError as exc:
+                record_error(line, format_validation_error(exc))
+                continue
+
+            batch.append((line, food_row(restaurant_id, food)))
+            if len(batch) >= settings.FOOD_IMPORT_BATCH_SIZE:
+                flush()
+    except ImportAborted as exc:
+        record_error(exc.line, str(exc))
+
+    if batch:
+        flush()
+
+    elapsed = time.perf_counter() - started
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["rows_per_second"] = round(report["rows"] / elapsed, 1) if elapsed > 0 else None
+
+    return report
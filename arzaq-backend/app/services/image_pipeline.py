@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Set
+
+from PIL import UnidentifiedImageError
+
+from app.core.config import settings
+from app.services.storage import get_storage
+from app.utils.images import (
+    VARIANT_FORMATS, VARIANTS_SUBDIR, render_variants, source_width, upload_stem, variant_filename, variant_widths,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def render_stored_variants(key: str, widths: List[int], quality: int) -> int:
+    """
+    Render the missing variants of a stored image (runs in a worker process)
+
+    The source is fetched from storage, rendered into a scratch directory
+    under UPLOAD_DIR and the variants saved back to storage. Widths the
+    image is too narrow for are skipped (see variant_widths).
+
+    Returns:
+        Number of variant files stored
+    """
+    storage = get_storage()
+    stem = os.path.splitext(os.path.basename(key))[0]
+
+    missing = [
+        (width, fmt, f"{VARIANTS_SUBDIR}/{variant_filename(stem, width, fmt)}")
+        for width in variant_widths(widths, source_width(stem))
+        for fmt in VARIANT_FORMATS
+    ]
+    missing = [variant for variant in missing if not storage.exists(variant[2])]
+    if not missing:
+        return 0
+
+    with storage.local_copy(key) as source_path, \
+            tempfile.TemporaryDirectory(dir=settings.UPLOAD_DIR, prefix=".render-") as output_dir:
+        render_variants(source_path, output_dir, sorted({width for width, _, _ in missing}), quality)
+        for _, fmt, variant_key in missing:
+            storage.save_file(variant_key, os.path.join(output_dir, os.path.basename(variant_key)), f"image/{fmt}")
+
+    return len(missing)
+
+
+class ImagePipeline:
+    """
+    Renders image variants in a process pool, off the request path
+
+    Resizing and encoding are CPU-bound, so they run in worker processes
+    rather than threads. Failed renders are retried with a growing delay;
+    rendering is idempotent, so a retry or a later backfill only writes
+    what is missing.
+    """
+
+    def __init__(self, workers: int, attempts: int, retry_delay_seconds: float):
+        self.workers = workers
+        self.attempts = attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers: forking a process with live DB connections
+            # and threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def submit(self, image_url: str):
+        """Render the variants of an uploaded image in the background"""
+        task = asyncio.create_task(self.process(image_url))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def process(self, image_url: str) -> int:
+        """
+        Render the missing variants of an uploaded image
+
+        Args:
+            image_url: URL path returned by the upload endpoint
+
+        Returns:
+            Number of variant files written
+        """
+        if upload_stem(image_url) is None:
+            return 0
+
+        key = image_url[len("/uploads/"):]
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return await loop.run_in_executor(
+                    self._get_executor(),
+                    render_stored_variants,
+                    key,
+                    settings.IMAGE_VARIANT_WIDTHS_LIST,
+                    settings.IMAGE_VARIANT_QUALITY,
+                )
+            except (FileNotFoundError, UnidentifiedImageError) as exc:
+                # Retrying cannot help
+                logger.warning(f"Cannot render variants of {image_url}: {exc}")
+                return 0
+            except BrokenProcessPool:
+                logger.warning("Image worker died; restarting the pool")
+                self._executor = None
+            except Exception:
+                logger.exception(f"Rendering variants of {image_url} failed (attempt {attempt}/{self.attempts})")
+
+            if attempt < self.attempts:
+                await asyncio.sleep(self.retry_delay_seconds * attempt)
+
+        logger.error(f"Giving up on variants of {image_url}; run scripts/generate_image_variants.py to retry")
+        return 0
+
+    async def shutdown(self):
+        """Cancel pending renders and stop the worker processes"""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+image_pipeline = ImagePipeline(
+    workers=settings.IMAGE_WORKERS,
+    attempts=settings.IMAGE_PROCESS_ATTEMPTS,
+    retry_delay_seconds=settings.IMAGE_RETRY_DELAY_SECONDS,
+)
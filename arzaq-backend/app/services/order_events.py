@@ -0,0 +1,373 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Text, case, cast, delete, event, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+from sqlalchemy.orm import Session
+from starlette.websockets import WebSocket
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, try_advisory_lock
+from app.models.food import Food
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.order_event import OrderEvent
+from app.services.event_broker import MAX_NOTIFY_PAYLOAD, EventBroker, PostgresEventBridge, Subscription, notify_payloads
+
+logger = logging.getLogger(__name__)
+
+# Postgres NOTIFY channel shared by all replicas
+CHANNEL = "order_events"
+
+# created: checkout; paid: payment confirmed; status: restaurant update or
+# cancellation; picked_up: order completed
+EVENT_TYPES = ("created", "paid", "status", "picked_up")
+
+# Advisory lock key shared by all replicas ("ARZQ" + 3)
+PRUNER_LOCK_KEY = 0x41525A51_0003
+
+# Session.info keys: changes recorded during the transaction, and events
+# built from them waiting for the commit
+_PENDING_KEY = "order_events"
+_READY_KEY = "order_events_ready"
+
+order_event_broker = EventBroker(queue_size=settings.ORDER_EVENTS_QUEUE_SIZE)
+order_event_bridge = PostgresEventBridge(order_event_broker, CHANNEL, settings.ORDER_EVENTS_RECONNECT_SECONDS)
+
+
+def start_order_events():
+    """Start the broker, plus the cross-replica bridge on Postgres"""
+    order_event_broker.start()
+    if engine.dialect.name == "postgresql":
+        order_event_bridge.start()
+
+
+def stop_order_events():
+    order_event_bridge.stop()
+    order_event_broker.stop()
+
+
+def publish_order_event(db: Session, event_type: str, order_id: int):
+    """
+    Send an order event to the restaurants of the order once the current
+    transaction commits
+
+    Args:
+        db: Session running the write
+        event_type: One of EVENT_TYPES
+        order_id: Order that changed
+    """
+    pending: List[Tuple[str, int]] = db.info.setdefault(_PENDING_KEY, [])
+    if (event_type, order_id) not in pending:
+        pending.append((event_type, order_id))
+
+
+def _build_events(session: Session, pending: List[Tuple[str, int]]) -> List[dict]:
+    """Store one event per (change, restaurant) and return them with their sequence numbers"""
+    order_ids = {order_id for _, order_id in pending}
+
+    # Each restaurant only sees its own items of the order
+    orders = {}
+    items: Dict[Tuple[int, int], list] = defaultdict(list)
+    for order_id, status, created_at, restaurant_id, food_id, food_name, quantity in session.execute(
+        select(
+            Order.id, Order.status, Order.created_at,
+            OrderItem.restaurant_id, OrderItem.food_id, Food.name, OrderItem.quantity,
+        )
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .join(Food, OrderItem.food_id == Food.id)
+        .where(Order.id.in_(order_ids))
+        .order_by(OrderItem.id)
+    ):
+        orders[order_id] = (status, created_at)
+        items[(order_id, restaurant_id)].append({"food_id": food_id, "food_name": food_name, "quantity": quantity})
+
+    rows = []
+    for event_type, order_id in pending:
+        if order_id not in orders:
+            continue
+        status, created_at = orders[order_id]
+        for (item_order_id, restaurant_id), restaurant_items in items.items():
+            if item_order_id != order_id:
+                continue
+            rows.append({
+                "restaurant_id": restaurant_id,
+                "order_id": order_id,
+                "type": event_type,
+                "payload": {
+                    "type": event_type,
+                    "order_id": order_id,
+                    "restaurant_id": restaurant_id,
+                    "status": status.value,
+                    "created_at": created_at.isoformat() if created_at else None,
+                    "items": restaurant_items,
+                },
+            })
+
+    if not rows:
+        return []
+
+    seqs = session.scalars(
+        insert(OrderEvent).returning(OrderEvent.id, sort_by_parameter_order=True),
+        rows,
+    ).all()
+
+    return [{"seq": seq, **row["payload"]} for seq, row in zip(seqs, rows)]
+
+
+def insert_order_events(changed, event_type: str, status: OrderStatus):
+    """
+    INSERT ... SELECT of the events of orders changed by a data-modifying
+    CTE (Postgres only)
+
+    For writes that must stay a single statement, instead of
+    publish_order_event (which re-reads the orders at commit). Builds the
+    same payloads as _build_events in SQL and pg_notify()s each event from
+    RETURNING; Postgres delivers the notifications on commit.
+
+    Args:
+        changed: CTE of the changed orders, with id and created_at columns
+        event_type: One of EVENT_TYPES
+        status: Status the statement sets
+
+    Returns:
+        INSERT statement returning the sequence numbers, to run as a CTE
+    """
+    # Each restaurant only sees its own items of the order
+    items = (
+        select(
+            OrderItem.order_id,
+            OrderItem.restaurant_id,
+            func.jsonb_agg(aggregate_order_by(
+                func.jsonb_build_object("food_id", OrderItem.food_id, "food_name", Food.name, "quantity", OrderItem.quantity),
+                OrderItem.id,
+            )).label("restaurant_items"),
+        )
+        .join(Food, OrderItem.food_id == Food.id)
+        .where(OrderItem.order_id.in_(select(changed.c.id)))
+        .group_by(OrderItem.order_id, OrderItem.restaurant_id)
+        .subquery()
+    )
+    payload = func.jsonb_build_object(
+        "type", event_type,
+        "order_id", changed.c.id,
+        "restaurant_id", items.c.restaurant_id,
+        "status", status.value,
+        "created_at", changed.c.created_at,
+        "items", items.c.restaurant_items,
+    )
+
+    # Same shape as _prepare_order_events: an oversized item list goes
+    # out as null (the table keeps it for replay)
+    order_event = func.jsonb_build_object("seq", OrderEvent.id).op("||")(cast(OrderEvent.payload, JSONB))
+    notified = case(
+        (func.octet_length(cast(order_event, Text)) < MAX_NOTIFY_PAYLOAD, order_event),
+        else_=order_event.op("||")(func.jsonb_build_object("items", None)),
+    )
+
+    return (
+        insert(OrderEvent)
+        .from_select(
+            ["restaurant_id", "order_id", "type", "payload"],
+            select(items.c.restaurant_id, changed.c.id, literal(event_type), payload)
+            .join_from(changed, items, items.c.order_id == changed.c.id),
+        )
+        .returning(OrderEvent.id, func.pg_notify(CHANNEL, cast(func.jsonb_build_array(notified), Text)))
+    )
+
+
+@event.listens_for(Session, "before_commit")
+def _prepare_order_events(session: Session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    # before_commit runs ahead of the final flush; read the state being committed
+    session.flush()
+    events = _build_events(session, pending)
+    if session.get_bind().dialect.name == "postgresql":
+        # Delivered by Postgres on commit, to every replica including this one.
+        # An oversized item list goes out as null (the table keeps it for replay)
+        events = [
+            order_event if len(json.dumps(order_event)) < MAX_NOTIFY_PAYLOAD else {**order_event, "items": None}
+            for order_event in events
+        ]
+        for payload in notify_payloads(events):
+            session.execute(select(func.pg_notify(CHANNEL, payload)))
+    else:
+        session.info[_READY_KEY] = events
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_order_events(session: Session):
+    events = session.info.pop(_READY_KEY, None)
+    if events:
+        order_event_broker.publish(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_order_events(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_READY_KEY, None)
+
+
+def replay_order_events(db: Session, restaurant_id: int, since: int) -> Optional[List[dict]]:
+    """
+    Events of a restaurant after sequence number since
+
+    Returns:
+        Events oldest first, or None if some were pruned or there are more
+        than ORDER_EVENTS_REPLAY_LIMIT (the client must reload its queue)
+    """
+    oldest = db.scalar(select(func.min(OrderEvent.id)))
+    if oldest is None or since < oldest - 1:
+        return None
+
+    rows = db.execute(
+        select(OrderEvent.id, OrderEvent.payload)
+        .where(OrderEvent.restaurant_id == restaurant_id, OrderEvent.id > since)
+        .order_by(OrderEvent.id)
+        .limit(settings.ORDER_EVENTS_REPLAY_LIMIT + 1)
+    ).all()
+
+    if len(rows) > settings.ORDER_EVENTS_REPLAY_LIMIT:
+        return None
+
+    return [{"seq": seq, **payload} for seq, payload in rows]
+
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+async def stream_order_events(
+    websocket: WebSocket,
+    subscription: Subscription,
+    replay: Optional[List[dict]],
+    keepalive_seconds: float,
+):
+    """
+    Accept the WebSocket and send replayed, then live, order events until
+    the client goes away
+
+    The subscription is released however this ends. replay None (events
+    could not be replayed) sends {"type": "reset"} first; live events
+    already covered by the replay are skipped. Sends {"type": "keepalive"}
+    on idle connections and a final {"type": "overflow"} if the client
+    fell too far behind (it should reload its queue and reconnect).
+    """
+    disconnected = None
+    try:
+        await websocket.accept()
+        if replay is None:
+            await websocket.send_json({"type": "reset"})
+            replay = []
+
+        for order_event in replay:
+            await websocket.send_json(order_event)
+        replayed = {order_event["seq"] for order_event in replay}
+
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(websocket))
+        while True:
+            received = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {received, disconnected}, timeout=keepalive_seconds, return_when=asyncio.FIRST_COMPLETED
+            )
+            if received not in done:
+                received.cancel()
+                if disconnected in done:
+                    return
+                await websocket.send_json({"type": "keepalive"})
+                continue
+
+            order_event = received.result()
+            if order_event is None:
+                await websocket.send_json({"type": "overflow"})
+                await websocket.close()
+                return
+
+            if order_event["seq"] not in replayed:
+                await websocket.send_json(order_event)
+    finally:
+        if disconnected is not None:
+            disconnected.cancel()
+        order_event_broker.unsubscribe(subscription)
+
+
+class OrderEventPruner:
+    """
+    Background job that deletes order events older than the replay window
+
+    Deletes in batches so a backlog never holds long locks. Only one
+    replica prunes at a time (Postgres advisory lock per tick).
+    """
+
+    def __init__(self, interval_seconds: int, retention_hours: int, batch_size: int):
+        self.interval_seconds = interval_seconds
+        self.retention_hours = retention_hours
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the pruner loop on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the pruner loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                while await asyncio.to_thread(self.tick) >= self.batch_size:
+                    pass
+            except Exception:
+                logger.exception("Order event pruning failed")
+
+            await asyncio.sleep(self.interval_seconds)
+
+    def tick(self) -> int:
+        """
+        Delete one batch of expired order events
+
+        Returns:
+            Number of events deleted
+        """
+        db = SessionLocal()
+        try:
+            if not try_advisory_lock(db, PRUNER_LOCK_KEY):
+                return 0
+
+            cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
+            expired = select(OrderEvent.id).where(OrderEvent.created_at < cutoff).limit(self.batch_size)
+            deleted = db.execute(
+                delete(OrderEvent)
+                .where(OrderEvent.id.in_(expired.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+
+            db.commit()
+            return deleted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+order_event_pruner = OrderEventPruner(
+    interval_seconds=settings.ORDER_EVENTS_PRUNE_INTERVAL_SECONDS,
+    retention_hours=settings.ORDER_EVENTS_RETENTION_HOURS,
+    batch_size=settings.ORDER_EVENTS_PRUNE_BATCH_SIZE,
+)
@@ -0,0 +1,96 @@
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.user import User
+from app.services.order_events import insert_order_events, publish_order_event
+
+# Orders that can be handed over at the counter
+PICKUP_STATUSES = (OrderStatus.PAID, OrderStatus.CONFIRMED, OrderStatus.READY)
+
+
+def has_restaurant_items(restaurant_id: int, order_id=Order.__table__.c.id):
+    """
+    EXISTS clause: the order has items of the restaurant (one index probe)
+
+    Correlated with the enclosing orders row by default; pass an order id
+    to check a single order.
+    """
+    return exists().where(OrderItem.order_id == order_id, OrderItem.restaurant_id == restaurant_id)
+
+
+def complete_pickup(db: Session, pickup_code: str, restaurant_id: int) -> Optional[tuple]:
+    """
+    Mark the order with a pickup code as completed, in one statement
+
+    The UPDATE only matches a pickable order of the restaurant (unique
+    index on pickup_code, then an index probe on order_items), so the
+    lookup, the ownership check and the status change are one round trip
+    and concurrent scans of the same code cannot both succeed. On Postgres
+    the same statement also stores and notifies the picked_up events;
+    elsewhere they are built at commit by publish_order_event.
+
+    Args:
+        db: Database session (the caller commits)
+        pickup_code: Code read from the customer's QR code
+        restaurant_id: Restaurant scanning the code
+
+    Returns:
+        (order_id, customer_name, completed_at), or None if nothing was
+        completed (see diagnose_pickup)
+    """
+    orders = Order.__table__
+
+    # Core UPDATE: the ORM would refresh the whole Order afterwards
+    completion = (
+        update(orders)
+        .where(
+            orders.c.pickup_code == pickup_code,
+            orders.c.status.in_(PICKUP_STATUSES),
+            has_restaurant_items(restaurant_id),
+        )
+        .values(status=OrderStatus.COMPLETED, completed_at=func.now())
+    )
+
+    if db.get_bind().dialect.name == "postgresql":
+        done = completion.returning(orders.c.id, orders.c.user_id, orders.c.created_at, orders.c.completed_at).cte("done")
+        events = insert_order_events(done, "picked_up", OrderStatus.COMPLETED).cte("events")
+        customer_name = select(User.full_name).where(User.id == done.c.user_id).scalar_subquery()
+        # add_cte: nothing selects from events, but it must run
+        return db.execute(
+            select(done.c.id, customer_name.label("full_name"), done.c.completed_at).add_cte(events)
+        ).first()
+
+    # Customer name from a correlated subquery (SQLite cannot RETURN
+    # columns of an UPDATE ... FROM table)
+    customer_name = select(User.full_name).where(User.id == orders.c.user_id).scalar_subquery()
+    row = db.execute(
+        completion.returning(orders.c.id, customer_name.label("full_name"), orders.c.completed_at)
+    ).first()
+
+    if row is not None:
+        publish_order_event(db, "picked_up", row.id)
+
+    return row
+
+
+def diagnose_pickup(db: Session, pickup_code: str, restaurant_id: int) -> Optional[tuple]:
+    """
+    Why complete_pickup matched nothing (slow path, one query)
+
+    Returns:
+        (order_id, status, completed_at, customer_name, owned), or None if
+        no order has this pickup code
+    """
+    return db.execute(
+        select(
+            Order.id,
+            Order.status,
+            Order.completed_at,
+            User.full_name,
+            has_restaurant_items(restaurant_id).label("owned"),
+        )
+        .join(User, Order.user_id == User.id)
+        .where(Order.pickup_code == pickup_code)
+    ).first()
@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import hmac
+import io
+import uuid
+
+import qrcode
+import qrcode.image.svg
+
+from app.core.config import settings
+from app.utils.cache import TTLCache, MISSING
+
+QR_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def new_pickup_code(order_id: int) -> str:
+    """Unique code shown (as a QR code) at pickup"""
+    return f"ARZAQ-{order_id}-{uuid.uuid4().hex[:8].upper()}"
+
+
+def qr_code_signature(order_id: int, pickup_code: str) -> str:
+    """Secret part of the QR code image URL, derived from SECRET_KEY"""
+    message = f"qr:{order_id}:{pickup_code}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()[:32]
+
+
+def is_valid_qr_code_signature(order_id: int, pickup_code: str, signature: str) -> bool:
+    return hmac.compare_digest(signature, qr_code_signature(order_id, pickup_code))
+
+
+def qr_code_url(order_id: int, pickup_code: str, fmt: str = "png") -> str:
+    """
+    URL of the pickup QR code image that works without a bearer token
+
+    The URL is the capability: it can be used directly as an <img> src,
+    and only someone who was given it (the customer) can build it.
+    """
+    return f"/api/orders/{order_id}/qr/{qr_code_signature(order_id, pickup_code)}.{fmt}"
+
+
+def render_qr_code(data: str, fmt: str) -> bytes:
+    """
+    Encode data as a QR code image
+
+    Args:
+        data: Text to encode (pickup code)
+        fmt: "png" or "svg"
+
+    Returns:
+        Encoded image
+    """
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    if fmt == "svg":
+        return qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).to_string()
+
+    buffer = io.BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class QRCodeCache:
+    """
+    Renders pickup QR codes on demand, keeping recent ones in memory
+
+    Rendering runs in a worker thread so it never blocks the event loop;
+    a pickup code never changes, so encoded images can be reused until
+    they fall out of the LRU.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.entries = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    async def get(self, pickup_code: str, fmt: str) -> bytes:
+        key = (pickup_code, fmt)
+        image = self.entries.get(key)
+        if image is MISSING:
+            image = await asyncio.to_thread(render_qr_code, pickup_code, fmt)
+            self.entries.set(key, image)
+
+        return image
+
+
+qr_code_cache = QRCodeCache(
+    maxsize=settings.QR_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.QR_CACHE_TTL_SECONDS,
+)
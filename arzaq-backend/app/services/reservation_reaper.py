@@ -0,0 +1,131 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.database import SessionLocal, try_advisory_lock
+from app.models.reservation import Reservation, ReservationStatus
+from app.services.availability import expire_reservations
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock key shared by all replicas ("ARZQ" + 1)
+REAPER_LOCK_KEY = 0x41525A51_0001
+
+
+class ReservationReaper:
+    """
+    Background job that moves timed-out reservations to EXPIRED
+
+    Upcoming deadlines are kept in a min-heap of (expires_at, reservation_id).
+    Each tick loads deadlines due within the next interval from the database,
+    expires everything already due with a single UPDATE and releases the
+    reserved_quantity counters. Between ticks the reaper sleeps until the
+    earliest known deadline, so holds are released close to their expiry.
+
+    Only one replica reaps at a time (Postgres advisory lock per tick).
+    """
+
+    def __init__(self, interval_seconds: int, batch_size: int):
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._heap: List[Tuple[datetime, int]] = []
+        self._scheduled: Set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the reaper loop on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the reaper loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                # Keep going while a full batch was expired (backlog)
+                while await asyncio.to_thread(self.tick) >= self.batch_size:
+                    pass
+            except Exception:
+                logger.exception("Reservation reaper tick failed")
+
+            await asyncio.sleep(self._seconds_until_next_deadline())
+
+    def _seconds_until_next_deadline(self) -> float:
+        if not self._heap:
+            return self.interval_seconds
+
+        remaining = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+        return min(self.interval_seconds, max(remaining, 0.1))
+
+    def tick(self) -> int:
+        """
+        Expire due reservations once
+
+        Returns:
+            Number of reservations expired
+        """
+        db = SessionLocal()
+        try:
+            if not try_advisory_lock(db, REAPER_LOCK_KEY):
+                # Another replica is reaping; forget local state, it may be stale
+                self._heap.clear()
+                self._scheduled.clear()
+                return 0
+
+            now = datetime.utcnow()
+            self._load_upcoming(db, now + timedelta(seconds=self.interval_seconds))
+
+            due = []
+            while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+                _, reservation_id = heapq.heappop(self._heap)
+                self._scheduled.discard(reservation_id)
+                due.append(reservation_id)
+
+            if due:
+                released = expire_reservations(db, reservation_ids=due)
+                logger.info(f"Expired {len(due)} reservations, released {sum(released.values())} portions")
+
+            db.commit()
+            return len(due)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _load_upcoming(self, db, horizon: datetime):
+        """Push ACTIVE reservations expiring before horizon onto the heap"""
+        rows = (
+            db.query(Reservation.id, Reservation.expires_at)
+            .filter(
+                Reservation.status == ReservationStatus.ACTIVE,
+                Reservation.expires_at <= horizon,
+            )
+            .order_by(Reservation.expires_at)
+            .limit(self.batch_size)
+            .all()
+        )
+
+        for reservation_id, expires_at in rows:
+            if reservation_id not in self._scheduled:
+                self._scheduled.add(reservation_id)
+                if expires_at.tzinfo is not None:
+                    expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+                heapq.heappush(self._heap, (expires_at, reservation_id))
+
+
+reservation_reaper = ReservationReaper(
+    interval_seconds=settings.RESERVATION_REAPER_INTERVAL_SECONDS,
+    batch_size=settings.RESERVATION_REAPER_BATCH_SIZE,
+)
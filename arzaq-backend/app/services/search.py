@@ -0,0 +1,160 @@
+import bisect
+import difflib
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, literal
+from sqlalchemy.orm import Query, Session
+
+from app.models.food import Food, SEARCH_CONFIG, search_vector
+from app.services.catalog_cache import catalog_cache, GLOBAL_SCOPE
+
+_WORD = re.compile(r"\w+")
+
+# Longer queries are truncated; they only narrow results further
+MAX_QUERY_TOKENS = 8
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """Lowercase words of a text (unicode-aware, so Cyrillic works too)"""
+    return _WORD.findall((value or "").lower())
+
+
+def search_catalog(db: Session, query: Query, q: str, limit: int) -> list:
+    """
+    Rank catalog rows matching a search text
+
+    Every word must match the start of a word in the name or description.
+    When nothing matches, falls back to fuzzy matching on names so small
+    typos still find results.
+
+    Args:
+        db: Database session
+        query: Catalog query with restaurant/availability filters applied
+        q: Search text
+        limit: Maximum number of rows
+
+    Returns:
+        Rows of query, best match first
+    """
+    tokens = tokenize(q)[:MAX_QUERY_TOKENS]
+    if not tokens:
+        return []
+
+    if db.get_bind().dialect.name == "postgresql":
+        return _search_postgres(query, tokens, limit)
+
+    return memory_index.search(db, query, tokens, limit)
+
+
+def _search_postgres(query: Query, tokens: List[str], limit: int) -> list:
+    """Full-text search on ix_foods_search_vector, trigram fallback on ix_foods_name_trgm"""
+    vector = search_vector()
+    # Tokens only contain word characters, so they are safe tsquery operands
+    ts_query = func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{token}:*" for token in tokens))
+
+    rows = (
+        query.filter(vector.op("@@")(ts_query))
+        .order_by(func.ts_rank(vector, ts_query).desc(), Food.id.desc())
+        .limit(limit)
+        .all()
+    )
+    if rows:
+        return rows
+
+    phrase = " ".join(tokens)
+    return (
+        query.filter(literal(phrase).op("<%")(Food.name))
+        .order_by(func.word_similarity(phrase, Food.name).desc(), Food.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+class InMemorySearchIndex:
+    """
+    Inverted index over food names and descriptions
+
+    Used where Postgres full-text search is unavailable (SQLite dev
+    setups). Rebuilt from the database whenever the global catalog
+    version changes, i.e. after any food is created, updated or deleted.
+    """
+
+    NAME_WEIGHT = 2.0
+    DESCRIPTION_WEIGHT = 1.0
+    FUZZY_CUTOFF = 0.75
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._terms: List[str] = []  # Sorted, for prefix lookups
+        self._name_terms: List[str] = []
+
+    def search(self, db: Session, query: Query, tokens: List[str], limit: int) -> list:
+        with self._lock:
+            self._refresh(db)
+            scores = self._score(tokens) or self._score_fuzzy(tokens)
+
+        if not scores:
+            return []
+
+        rows = query.filter(Food.id.in_(scores.keys())).all()
+        rows.sort(key=lambda row: (-scores[row.id], -row.id))
+        return rows[:limit]
+
+    def _refresh(self, db: Session):
+        version = catalog_cache.version(db, GLOBAL_SCOPE)
+        if version == self._version:
+            return
+
+        postings = defaultdict(dict)
+        name_terms = set()
+
+        for food_id, name, description in db.query(Food.id, Food.name, Food.description):
+            for term in tokenize(description):
+                postings[term][food_id] = self.DESCRIPTION_WEIGHT
+            for term in tokenize(name):
+                postings[term][food_id] = self.NAME_WEIGHT
+                name_terms.add(term)
+
+        self._postings = dict(postings)
+        self._terms = sorted(postings)
+        self._name_terms = sorted(name_terms)
+        self._version = version
+
+    def _prefix_matches(self, token: str) -> Dict[int, float]:
+        """Best weight per food for terms starting with token"""
+        matches = {}
+        for term in self._terms[bisect.bisect_left(self._terms, token):]:
+            if not term.startswith(token):
+                break
+            for food_id, weight in self._postings[term].items():
+                matches[food_id] = max(weight, matches.get(food_id, 0.0))
+
+        return matches
+
+    def _score(self, tokens: List[str]) -> Dict[int, float]:
+        """Foods matching every token, scored by summed weights"""
+        scores = self._prefix_matches(tokens[0])
+        for token in tokens[1:]:
+            matches = self._prefix_matches(token)
+            scores = {food_id: score + matches[food_id] for food_id, score in scores.items() if food_id in matches}
+
+        return scores
+
+    def _score_fuzzy(self, tokens: List[str]) -> Dict[int, float]:
+        """Foods whose names contain words close to any token"""
+        scores = defaultdict(float)
+        for token in tokens:
+            for term in difflib.get_close_matches(token, self._name_terms, n=5, cutoff=self.FUZZY_CUTOFF):
+                similarity = difflib.SequenceMatcher(None, token, term).ratio()
+                for food_id, weight in self._postings[term].items():
+                    scores[food_id] += similarity * weight
+
+        return dict(scores)
+
+
+memory_index = InMemorySearchIndex()
@@ -0,0 +1,174 @@
+import os
+import shutil
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from app.core.config import settings
+from app.utils.http_cache import IMMUTABLE_CACHE_CONTROL
+from app.utils.static_files import is_immutable_key
+
+STORAGE_BACKENDS = ("local", "s3")
+
+
+class Storage(ABC):
+    """
+    Where uploaded images and their variants are kept
+
+    Keys are paths relative to /uploads (e.g. "3f9a...jpg",
+    "variants/3f9a...-160w.webp"), so the URLs
+    stored in the database do not depend on the backend. Methods block;
+    call them from a thread in async code.
+    """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def save_file(self, key: str, path: str, content_type: str):
+        """Store a local file under key, consuming it (it may be moved)"""
+
+    @abstractmethod
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        """
+        Path of a local file with the content of key, for the duration of the block
+
+        Raises:
+            FileNotFoundError: If key does not exist
+        """
+
+    def url(self, key: str) -> Optional[str]:
+        """URL clients are redirected to, or None when files are served by this app"""
+        return None
+
+
+class LocalStorage(Storage):
+    """Files under UPLOAD_DIR, served by the app itself (single replica only)"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def save_file(self, key: str, path: str, content_type: str):
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.replace(path, target)
+        except OSError:
+            # Different filesystem: copy next to the target, then rename atomically
+            temp_path = f"{target}.{uuid.uuid4().hex}.tmp"
+            shutil.copyfile(path, temp_path)
+            os.replace(temp_path, target)
+            os.remove(path)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        path = self.path(key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        yield path
+
+
+class S3Storage(Storage):
+    """
+    Files in an S3-compatible bucket (AWS S3, MinIO, DigitalOcean Spaces)
+
+    Uses one thread-safe client per process, with a connection pool of
+    S3_MAX_POOL_CONNECTIONS. Uploads stream from disk (multipart for
+    large files). Reads are redirects to S3_PUBLIC_URL when set (public
+    bucket or CDN), otherwise to presigned URLs.
+    """
+
+    def __init__(self):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)")
+
+        if not settings.S3_BUCKET:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+
+        self.bucket = settings.S3_BUCKET
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            config=Config(
+                max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                retries={"mode": "standard"},
+                # MinIO and most self-hosted stores need path-style URLs
+                s3={"addressing_style": "path" if settings.S3_ENDPOINT_URL else "auto"},
+            ),
+        )
+
+    def _key(self, key: str) -> str:
+        return f"{settings.S3_KEY_PREFIX}{key}"
+
+    def _extra_args(self, key: str, content_type: str) -> dict:
+        extra = {"ContentType": content_type}
+        if is_immutable_key(key):
+            extra["CacheControl"] = IMMUTABLE_CACHE_CONTROL
+        return extra
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def save_file(self, key: str, path: str, content_type: str):
+        self.client.upload_file(path, self.bucket, self._key(key), ExtraArgs=self._extra_args(key, content_type))
+        os.remove(path)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        from botocore.exceptions import ClientError
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, os.path.basename(key))
+            try:
+                self.client.download_file(self.bucket, self._key(key), path)
+            except ClientError as exc:
+                if exc.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                    raise FileNotFoundError(key)
+                raise
+            yield path
+
+    def url(self, key: str) -> str:
+        if settings.S3_PUBLIC_URL:
+            return f"{settings.S3_PUBLIC_URL.rstrip('/')}/{self._key(key)}"
+
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._key(key)},
+            ExpiresIn=settings.S3_PRESIGN_SECONDS,
+        )
+
+
+@lru_cache(maxsize=1)
+def get_storage() -> Storage:
+    """Storage backend selected by STORAGE_BACKEND (one instance per process)"""
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage()
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage(settings.UPLOAD_DIR)
+
+    raise RuntimeError(f"Unknown STORAGE_BACKEND {settings.STORAGE_BACKEND!r}. Allowed: {', '.join(STORAGE_BACKENDS)}")
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import uuid
+from typing import Optional
+
+import aiofiles
+from fastapi import HTTPException, UploadFile, status
+from PIL import UnidentifiedImageError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.storage import get_storage
+from app.utils.images import image_width
+
+# Bytes read from the upload and written to disk per step
+CHUNK_SIZE = 64 * 1024
+
+# Hex digits of the SHA-256 content hash used as file name
+CONTENT_HASH_LENGTH = 32
+
+# File extension saved for each detected image type
+IMAGE_EXTENSIONS = {"jpeg": "jpg", "png": "png", "webp": "webp"}
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """
+    Detect an image type from its leading bytes
+
+    Returns:
+        "jpeg", "png" or "webp", or None for anything else
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+async def save_upload_file(upload_file: UploadFile) -> str:
+    """
+    Stream an uploaded image to storage and return its URL path
+
+    The file is copied in CHUNK_SIZE pieces with non-blocking writes, so
+    neither the event loop nor memory is held by the whole image. The type
+    comes from the file's magic bytes (its extension only has to be an
+    allowed one) and MAX_UPLOAD_SIZE is enforced while copying.
+
+    Files are named after a hash of their content: uploading the same
+    image again returns the existing URL without storing a second copy,
+    and a URL never changes content (see UploadStaticFiles). The name also
+    records the image width ("<hash>-<width>px.jpg"), so variant URLs can
+    leave out widths the image is too narrow for. The file is staged in
+    UPLOAD_DIR, then handed to the storage backend.
+
+    Args:
+        upload_file: FastAPI UploadFile
+
+    Returns:
+        Relative path to saved file
+
+    Raises:
+        HTTPException: If file is invalid
+    """
+    file_ext = (upload_file.filename or "").rsplit(".", 1)[-1].lower()
+    if file_ext not in settings.ALLOWED_EXTENSIONS_LIST:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type not allowed. Allowed: {settings.ALLOWED_EXTENSIONS}"
+        )
+
+    await upload_file.seek(0)
+    chunk = await upload_file.read(CHUNK_SIZE)
+
+    image_type = sniff_image_type(chunk)
+    if image_type is None or IMAGE_EXTENSIONS[image_type] not in settings.ALLOWED_EXTENSIONS_LIST:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File content is not a supported image. Allowed: {settings.ALLOWED_EXTENSIONS}"
+        )
+
+    # Written under a temporary name until the hash is known
+    temp_path = os.path.join(settings.UPLOAD_DIR, f".{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with aiofiles.open(temp_path, "wb") as out:
+            while chunk:
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_SIZE:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"File too large. Max size: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
+                    )
+                digest.update(chunk)
+                await out.write(chunk)
+                chunk = await upload_file.read(CHUNK_SIZE)
+
+        try:
+            width = await run_in_threadpool(image_width, temp_path)
+        except (UnidentifiedImageError, OSError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File content is not a readable image"
+            )
+
+        filename = f"{digest.hexdigest()[:CONTENT_HASH_LENGTH]}-{width}px.{IMAGE_EXTENSIONS[image_type]}"
+        storage = get_storage()
+
+        if await run_in_threadpool(storage.exists, filename):
+            # Same content already stored
+            os.remove(temp_path)
+        else:
+            await run_in_threadpool(storage.save_file, filename, temp_path, f"image/{image_type}")
+    except BaseException:
+        # Never leave a partial file behind (size limit, I/O error, client gone)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return f"/uploads/{filename}"
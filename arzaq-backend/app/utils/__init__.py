@@ -1,4 +1,4 @@
-# app/utils/__init__.py
 from .geocoding import geocode_address
+from .pagination import encode_cursor, decode_cursor
 
-__all__ = ['geocode_address']
+__all__ = ['geocode_address', 'encode_cursor', 'decode_cursor']
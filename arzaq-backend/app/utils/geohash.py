@@ -0,0 +1,155 @@
+import math
+from typing import List, Tuple
+
+from sqlalchemy import func
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {char: index for index, char in enumerate(_BASE32)}
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+# Precision stored on restaurants (~150m cells); searches use shorter prefixes
+GEOHASH_PRECISION = 7
+
+
+def encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """
+    Encode a coordinate as a geohash string
+
+    Args:
+        latitude: Latitude in degrees
+        longitude: Longitude in degrees
+        precision: Number of characters
+
+    Returns:
+        Geohash of the cell containing the coordinate
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # Bits alternate longitude, latitude, longitude, ...
+
+    while len(chars) < precision:
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+
+        if value >= middle:
+            bits = (bits << 1) | 1
+            bounds[0] = middle
+        else:
+            bits <<= 1
+            bounds[1] = middle
+
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def decode(geohash: str) -> Tuple[float, float, float, float]:
+    """
+    Decode a geohash to its cell center and size
+
+    Returns:
+        (latitude, longitude, latitude_error, longitude_error) where the
+        errors are half the cell height/width in degrees
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            bounds = lon_range if even else lat_range
+            middle = (bounds[0] + bounds[1]) / 2
+            if (value >> shift) & 1:
+                bounds[0] = middle
+            else:
+                bounds[1] = middle
+            even = not even
+
+    return (
+        (lat_range[0] + lat_range[1]) / 2,
+        (lon_range[0] + lon_range[1]) / 2,
+        (lat_range[1] - lat_range[0]) / 2,
+        (lon_range[1] - lon_range[0]) / 2,
+    )
+
+
+def cell_size_km(precision: int, latitude: float) -> Tuple[float, float]:
+    """Height and width (km) of a geohash cell at the given latitude"""
+    lat_bits = (5 * precision) // 2
+    lon_bits = 5 * precision - lat_bits
+
+    height = 180.0 / (2 ** lat_bits) * KM_PER_DEGREE
+    width = 360.0 / (2 ** lon_bits) * KM_PER_DEGREE * math.cos(math.radians(latitude))
+
+    return height, width
+
+
+def precision_for_radius(radius_km: float, latitude: float) -> int:
+    """
+    Longest geohash precision whose cells are at least radius_km across
+
+    With such cells, the cell containing a point plus its 8 neighbours
+    cover every location within radius_km of it.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size_km(precision, latitude)
+        if height >= radius_km and width >= radius_km:
+            return precision
+
+    return 1
+
+
+def neighbors(geohash: str) -> List[str]:
+    """The cell itself and its 8 surrounding cells (same precision)"""
+    latitude, longitude, lat_err, lon_err = decode(geohash)
+    cells = []
+
+    for d_lat in (-1, 0, 1):
+        for d_lon in (-1, 0, 1):
+            lat = latitude + d_lat * 2 * lat_err
+            if not -90.0 <= lat <= 90.0:
+                continue
+            lon = (longitude + d_lon * 2 * lon_err + 180.0) % 360.0 - 180.0
+            cell = encode(lat, lon, len(geohash))
+            if cell not in cells:
+                cells.append(cell)
+
+    return cells
+
+
+def distance_km(latitude: float, longitude: float, lat_column, lon_column):
+    """
+    SQL expression for the great-circle distance from an origin to a row
+
+    Haversine formula with the origin's terms computed here, so the
+    database evaluates it per row (Postgres and SQLite math functions).
+
+    Args:
+        latitude: Origin latitude in degrees
+        longitude: Origin longitude in degrees
+        lat_column: Latitude column (degrees)
+        lon_column: Longitude column (degrees)
+
+    Returns:
+        Distance in km
+    """
+    lat1 = math.radians(latitude)
+    lat2 = func.radians(lat_column)
+    a = (
+        func.power(func.sin((lat2 - lat1) / 2), 2)
+        + math.cos(lat1) * func.cos(lat2) * func.power(func.sin((func.radians(lon_column) - math.radians(longitude)) / 2), 2)
+    )
+    # a stays below 1 for any distance a search radius allows
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(a))
@@ -0,0 +1,172 @@
+import os
+import re
+import uuid
+from typing import List, Optional, Sequence
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+
+# Variant format -> file extension
+VARIANT_FORMATS = {"webp": "webp", "jpeg": "jpg"}
+
+VARIANTS_SUBDIR = "variants"
+
+# Upload names end in the source width: "<hash>-<width>px"
+_SOURCE_WIDTH = re.compile(r"-(\d+)px$")
+
+# EXIF orientations that rotate the image by 90 degrees
+_ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def variant_filename(stem: str, width: int, fmt: str) -> str:
+    return f"{stem}-{width}w.{VARIANT_FORMATS[fmt]}"
+
+
+def upload_stem(image_url: Optional[str]) -> Optional[str]:
+    """File name (without extension) of an image stored in UPLOAD_DIR, else None"""
+    if not image_url or not image_url.startswith("/uploads/"):
+        return None
+
+    name = image_url[len("/uploads/"):]
+    if not name or "/" in name:
+        return None
+
+    return os.path.splitext(name)[0]
+
+
+def source_width(stem: str) -> Optional[int]:
+    """Width of an uploaded image recorded in its file name, None for older uploads"""
+    match = _SOURCE_WIDTH.search(stem)
+    return int(match.group(1)) if match else None
+
+
+def image_width(path: str) -> int:
+    """
+    Width of an image as displayed (after EXIF orientation)
+
+    Only the header is read, the pixels are not decoded.
+
+    Raises:
+        PIL.UnidentifiedImageError: If the file is not a readable image
+    """
+    with Image.open(path) as image:
+        if image.getexif().get(0x0112) in _ROTATED_ORIENTATIONS:
+            return image.height
+        return image.width
+
+
+def variant_widths(widths: Sequence[int], source: Optional[int]) -> List[int]:
+    """
+    Target widths worth rendering for an image `source` pixels wide
+
+    Widths at or above the source would only be copies of it, so they are
+    skipped; the narrowest target is always kept (at the source size) so
+    every image has a variant. Older uploads whose width is unknown get all
+    targets.
+    """
+    widths = sorted(widths)
+    if source is None:
+        return widths
+    return [width for width in widths if width < source] or widths[:1]
+
+
+def variant_urls(image_url: Optional[str]) -> Optional[List[dict]]:
+    """
+    URLs of the resized variants of an uploaded image
+
+    Names are derived from the original file name, so no lookup is
+    needed. Variants are rendered shortly after upload; clients should fall
+    back to the original image if one is not there yet.
+
+    Returns:
+        [{"width", "webp", "jpeg"}, ...] narrowest first, or None for
+        images not stored in UPLOAD_DIR. "width" is the real width of the
+        variant, which is the source width if the image is narrower than
+        every target.
+    """
+    stem = upload_stem(image_url)
+    if stem is None:
+        return None
+
+    source = source_width(stem)
+    return [
+        {
+            "width": min(width, source) if source else width,
+            **{fmt: f"/uploads/{VARIANTS_SUBDIR}/{variant_filename(stem, width, fmt)}" for fmt in VARIANT_FORMATS},
+        }
+        for width in variant_widths(settings.IMAGE_VARIANT_WIDTHS_LIST, source)
+    ]
+
+
+def render_variants(source_path: str, output_dir: str, widths: Sequence[int], quality: int) -> int:
+    """
+    Write resized WebP and JPEG copies of an image
+
+    Runs in a worker process. EXIF orientation is applied and the metadata
+    dropped. Variants newer than the source are kept, so re-running is
+    cheap and safe; files are written under a temporary name and renamed.
+    Images narrower than a width are not upscaled: pass the widths from
+    variant_widths() so no such copies are made.
+
+    Args:
+        source_path: Original image
+        output_dir: Directory for the variants
+        widths: Target widths in pixels
+        quality: Encoder quality (1-100)
+
+    Returns:
+        Number of files written
+    """
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    source_mtime = os.path.getmtime(source_path)
+
+    missing = {}
+    for width in widths:
+        for fmt in VARIANT_FORMATS:
+            path = os.path.join(output_dir, variant_filename(stem, width, fmt))
+            if not os.path.exists(path) or os.path.getmtime(path) < source_mtime:
+                missing.setdefault(width, []).append((fmt, path))
+
+    if not missing:
+        return 0
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    with Image.open(source_path) as original:
+        # JPEG sources can be decoded at a reduced scale directly (square
+        # bound, since EXIF orientation may still swap width and height)
+        largest = max(missing)
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+        icc_profile = original.info.get("icc_profile")
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    written = 0
+    for width in sorted(missing, reverse=True):
+        if image.width > width:
+            resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        else:
+            resized = image
+
+        for fmt, path in missing[width]:
+            output = resized
+            if fmt == "jpeg" and has_alpha:
+                output = Image.new("RGB", resized.size, "white")
+                output.paste(resized, mask=resized.getchannel("A"))
+
+            # Unique per writer: the same image may be rendered concurrently
+            temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            options = {"quality": quality, "icc_profile": icc_profile}
+            if fmt == "jpeg":
+                options.update(optimize=True, progressive=True)
+            else:
+                options.update(method=4)
+
+            output.save(temp_path, format=fmt.upper(), **options)
+            os.replace(temp_path, path)
+            written += 1
+
+    return written
@@ -0,0 +1,53 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor
+
+    Args:
+        values: Sort key values, e.g. (created_at, id)
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string from the client
+        types: Expected type of each value (datetime values are parsed)
+
+    Returns:
+        List of sort key values
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("unexpected cursor shape")
+
+        return [
+            datetime.fromisoformat(value) if expected is datetime else expected(value)
+            for value, expected in zip(values, types)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
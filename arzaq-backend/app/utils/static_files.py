@@ -0,0 +1,53 @@
+import os
+import re
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+from app.utils.http_cache import IMMUTABLE_CACHE_CONTROL
+from app.utils.images import VARIANTS_SUBDIR
+
+# Leading content hash of uploaded images and their variants
+_CONTENT_HASH = re.compile(r"^([0-9a-f]{32})(?:-\d+px)?(-\d+w)?\.")
+
+# Subdirectories (relative to UPLOAD_DIR) whose files never change
+IMMUTABLE_DIRS = ("", VARIANTS_SUBDIR)
+
+
+def is_immutable_key(key: str) -> bool:
+    """Whether an upload path is never overwritten (images and their variants)"""
+    return os.path.dirname(key) in IMMUTABLE_DIRS
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    Serves UPLOAD_DIR with long-lived caching for images
+
+    Uploaded images and their variants are never overwritten under the same
+    name, so they are sent as immutable for a year. Content-hashed names
+    also provide the ETag directly. Other files (QR codes) keep the default
+    revalidated behaviour.
+    """
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+        key = os.path.relpath(full_path, self.directory)
+        if is_immutable_key(key):
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+            match = _CONTENT_HASH.match(os.path.basename(key))
+            if match:
+                response.headers["etag"] = f'"{match.group(1)}{match.group(2) or ""}"'
+
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
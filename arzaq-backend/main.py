@@ -1,12 +1,19 @@
 # main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from app.core.config import settings
 from app.core.database import engine, Base
-from app.routers import auth, foods, restaurants, orders, payments
+from app.routers import auth, foods, restaurants, orders, payments, uploads
+from app.services.reservation_reaper import reservation_reaper
+from app.services.food_expiry import food_expiry_sweeper
+from app.services.catalog_cache import catalog_cache
+from app.utils.static_files import UploadStaticFiles
+from app.services.image_pipeline import image_pipeline
+from app.services.food_events import food_event_broker, start_food_events, stop_food_events
+from app.services.order_events import order_event_broker, order_event_pruner, start_order_events, stop_order_events
 import os
 
 # Create database tables
@@ -30,6 +37,29 @@ class ProxyHeadersMiddleware(BaseHTTPMiddleware):
         return response
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background jobs"""
+    start_food_events()
+    start_order_events()
+    if settings.ORDER_EVENTS_PRUNER_ENABLED:
+        order_event_pruner.start()
+    if settings.RESERVATION_REAPER_ENABLED:
+        reservation_reaper.start()
+    if settings.FOOD_EXPIRY_SWEEPER_ENABLED:
+        food_expiry_sweeper.start()
+
+    yield
+
+    if settings.ORDER_EVENTS_PRUNER_ENABLED:
+        await order_event_pruner.stop()
+    await food_expiry_sweeper.stop()
+    await reservation_reaper.stop()
+    stop_order_events()
+    stop_food_events()
+    await image_pipeline.shutdown()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
@@ -37,6 +67,7 @@ app = FastAPI(
     description="API for ARZAQ Food Rescue Platform",
     docs_url="/docs",  # Swagger UI
     redoc_url="/redoc",  # ReDoc
+    lifespan=lifespan,
 )
 
 # IMPORTANT: Add proxy headers middleware FIRST
@@ -51,9 +82,11 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
-# Mount static files (uploads)
-if os.path.exists(settings.UPLOAD_DIR):
-    app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+# Uploads: served from UPLOAD_DIR (images as immutable), or redirected to object storage
+if settings.STORAGE_BACKEND != "local":
+    app.include_router(uploads.router, prefix="/uploads", tags=["Uploads"])
+elif os.path.exists(settings.UPLOAD_DIR):
+    app.mount("/uploads", UploadStaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -81,6 +114,21 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/cache")
+async def cache_stats():
+    """Hit/miss counters of the public catalog cache (this worker)"""
+    return catalog_cache.stats()
+
+
+@app.get("/health/events")
+async def event_stats():
+    """Connected live feed clients (this worker)"""
+    return {
+        "subscribers": food_event_broker.subscriber_count,
+        "order_subscribers": order_event_broker.subscriber_count,
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,147 @@
+"""
+Benchmark pickup verification (restaurant QR scans)
+
+Creates a restaurant, a customer and --orders paid orders inside a
+transaction that is rolled back at the end, then scans every pickup code
+twice: once with the previous ORM path (load the order, lazy-load items,
+foods and customer, then update, events built at commit) and once with
+complete_pickup (UPDATE ... RETURNING; on Postgres the picked_up events
+are written and notified by the same statement). Prints latency
+percentiles and the number of SQL statements per scan, commit included
+(each commit releases a savepoint, which adds the same 2 statements to
+both). Nothing is left in the database.
+
+Usage:
+    python scripts/benchmark_pickup.py [--orders N] [--items M]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.models.food import Food
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.user import User, UserRole
+from app.services.order_events import publish_order_event
+from app.services.pickup import complete_pickup
+
+
+def seed(db: Session, orders: int, items: int) -> Tuple[int, List[str], List[str]]:
+    """Create 2 x orders paid orders for one restaurant; returns its id and two lists of pickup codes"""
+    tag = uuid.uuid4().hex[:8]
+    restaurant = User(email=f"bench-r-{tag}@example.com", full_name="Bench Restaurant", role=UserRole.RESTAURANT, is_approved=True)
+    customer = User(email=f"bench-c-{tag}@example.com", full_name="Bench Customer", role=UserRole.CLIENT)
+    db.add_all([restaurant, customer])
+    db.flush()
+
+    foods = db.scalars(
+        insert(Food).returning(Food.id),
+        [{"restaurant_id": restaurant.id, "name": f"Bench food {i}", "price": 1000, "quantity": 10 ** 6} for i in range(items)],
+    ).all()
+
+    codes = [f"BENCH-{tag}-{i}" for i in range(2 * orders)]
+    order_ids = db.scalars(
+        insert(Order).returning(Order.id, sort_by_parameter_order=True),
+        [
+            {"user_id": customer.id, "status": OrderStatus.PAID, "subtotal": 1000.0 * items, "platform_fee": 0.0, "total": 1000.0 * items, "pickup_code": code}
+            for code in codes
+        ],
+    ).all()
+    db.execute(
+        insert(OrderItem),
+        [
+            {"order_id": order_id, "food_id": food_id, "restaurant_id": restaurant.id, "quantity": 1, "price": 1000.0, "subtotal": 1000.0, "restaurant_amount": 900.0, "platform_amount": 100.0}
+            for order_id in order_ids
+            for food_id in foods
+        ],
+    )
+    db.commit()
+
+    return restaurant.id, codes[:orders], codes[orders:]
+
+
+def legacy_verify(db: Session, pickup_code: str, restaurant_id: int):
+    """verify_pickup_code before complete_pickup"""
+    order = db.query(Order).filter(Order.pickup_code == pickup_code).first()
+    if not any(item.food.restaurant_id == restaurant_id for item in order.items):
+        raise RuntimeError("not this restaurant's order")
+
+    order.status = OrderStatus.COMPLETED
+    order.completed_at = datetime.utcnow()
+    publish_order_event(db, "picked_up", order.id)
+    db.commit()
+    return order.id, order.user.full_name, order.completed_at
+
+
+def single_statement_verify(db: Session, pickup_code: str, restaurant_id: int):
+    completed = complete_pickup(db, pickup_code, restaurant_id)
+    db.commit()
+    return completed
+
+
+def run(db: Session, verify, codes: list, restaurant_id: int):
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        timings = []
+        for code in codes:
+            db.expunge_all()
+            started = time.perf_counter()
+            if verify(db, code, restaurant_id) is None:
+                raise RuntimeError(f"{code} was not completed")
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    return timings, len(statements) / len(codes)
+
+
+def report(name: str, timings: list, statements: float):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(
+        f"{name:<18} p50 {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms   "
+        f"mean {statistics.mean(timings):7.2f} ms   {statements:.1f} statements/scan"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=200, help="Scans per variant")
+    parser.add_argument("--items", type=int, default=3, help="Items per order")
+    args = parser.parse_args()
+
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Commits inside the benchmark release savepoints; the outer
+    # transaction is rolled back at the end
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        restaurant_id, legacy_codes, new_codes = seed(db, args.orders, args.items)
+        print(f"{args.orders} scans per variant, {args.items} items per order, {engine.dialect.name}")
+
+        report("ORM (previous)", *run(db, legacy_verify, legacy_codes, restaurant_id))
+        report("UPDATE RETURNING", *run(db, single_statement_verify, new_codes, restaurant_id))
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Check that every hot query is served by an index
+
+Runs EXPLAIN for the query shapes used by the foods, orders and payments
+routers against DATABASE_URL (Postgres only) and fails if any of them
+needs a sequential scan. Sequential scans are disabled for the session,
+so the planner picks an index whenever one can serve the query, even on
+small development tables.
+
+Usage:
+    python scripts/check_indexes.py
+"""
+import os
+import sys
+from datetime import datetime
+
+from sqlalchemy import func, literal, select, text
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.models.food import Food, SEARCH_CONFIG, search_vector
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.order_event import OrderEvent
+from app.models.payment import Payment
+from app.models.reservation import Reservation, ReservationStatus
+
+
+def hot_queries():
+    """(description, statement) pairs mirroring the router filters"""
+    now = datetime.utcnow()
+
+    return [
+        (
+            "foods: available items of a restaurant",
+            select(Food.id).where(Food.restaurant_id == 1, Food.is_available == True),
+        ),
+        (
+            "foods: expired items still listed (expiry sweeper)",
+            select(Food.id).where(Food.is_available == True, Food.expires_at <= now).limit(1000),
+        ),
+        (
+            "foods: full-text search",
+            select(Food.id).where(search_vector().op("@@")(func.to_tsquery(SEARCH_CONFIG, "lagman:*"))),
+        ),
+        (
+            "foods: fuzzy name search",
+            select(Food.id).where(literal("lagmn").op("<%")(Food.name)),
+        ),
+        (
+            "reservations: timed-out holds for a cart",
+            select(Reservation.id).where(
+                Reservation.food_id.in_([1, 2, 3]),
+                Reservation.status == ReservationStatus.ACTIVE,
+                Reservation.expires_at <= now,
+            ),
+        ),
+        (
+            "reservations: active holds of a user",
+            select(Reservation.id).where(
+                Reservation.user_id == 1,
+                Reservation.status == ReservationStatus.ACTIVE,
+            ),
+        ),
+        (
+            "reservations: holds of an order",
+            select(Reservation.id).where(Reservation.order_id == 1),
+        ),
+        (
+            "reservations: reaper deadlines",
+            select(Reservation.id)
+            .where(Reservation.status == ReservationStatus.ACTIVE, Reservation.expires_at <= now)
+            .order_by(Reservation.expires_at)
+            .limit(500),
+        ),
+        (
+            "order_items: items of an order",
+            select(OrderItem.id).where(OrderItem.order_id == 1),
+        ),
+        (
+            "order_items: orders containing a food",
+            select(OrderItem.order_id).where(OrderItem.food_id == 1),
+        ),
+        (
+            "order_items: orders of a restaurant",
+            select(OrderItem.order_id).where(OrderItem.restaurant_id == 1),
+        ),
+        (
+            "order_items: ownership check",
+            select(OrderItem.id).where(OrderItem.order_id == 1, OrderItem.restaurant_id == 1).limit(1),
+        ),
+        (
+            "orders: pickup code scan",
+            select(Order.id).where(Order.pickup_code == "ARZAQ-1-ABCDEF12"),
+        ),
+        (
+            "orders: history of a user",
+            select(Order.id).where(Order.user_id == 1).order_by(Order.created_at.desc()),
+        ),
+        (
+            "orders: orders in a status, newest first",
+            select(Order.id).where(Order.status == OrderStatus.PAID).order_by(Order.created_at.desc()),
+        ),
+        (
+            "order_events: replay for a restaurant",
+            select(OrderEvent.id).where(OrderEvent.restaurant_id == 1, OrderEvent.id > 100).order_by(OrderEvent.id),
+        ),
+        (
+            "order_events: pruning",
+            select(OrderEvent.id).where(OrderEvent.created_at < now).limit(5000),
+        ),
+        (
+            "payments: payment of an order",
+            select(Payment.id).where(Payment.order_id == 1),
+        ),
+        (
+            "payments: payments of a user",
+            select(Payment.id).where(Payment.user_id == 1),
+        ),
+    ]
+
+
+def main() -> int:
+    if engine.dialect.name != "postgresql":
+        print("Index check requires PostgreSQL")
+        return 1
+
+    failures = 0
+
+    with engine.connect() as conn:
+        conn.execute(text("SET enable_seqscan = off"))
+
+        for description, statement in hot_queries():
+            sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            plan = "\n".join(row[0] for row in conn.execute(text(f"EXPLAIN {sql}")))
+
+            if "Seq Scan" in plan:
+                failures += 1
+                print(f"FAIL  {description}\n{plan}\n")
+            else:
+                print(f"OK    {description}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
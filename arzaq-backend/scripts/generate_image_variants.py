@@ -0,0 +1,60 @@
+"""
+Render resized variants for every uploaded food image
+
+Backfill for uploads made before variants existed, and a retry for any
+render the API gave up on. Works with any STORAGE_BACKEND; existing
+variants are skipped, so the script can be re-run at any time.
+
+Usage:
+    python scripts/generate_image_variants.py [--workers N]
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.food import Food
+from app.services.image_pipeline import render_stored_variants
+from app.utils.images import upload_stem
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        images = [image for (image,) in db.query(Food.image).distinct() if upload_stem(image) is not None]
+    finally:
+        db.close()
+
+    print(f"Rendering variants for {len(images)} images with {args.workers} workers")
+    written = failed = 0
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(
+                render_stored_variants, image[len("/uploads/"):],
+                settings.IMAGE_VARIANT_WIDTHS_LIST, settings.IMAGE_VARIANT_QUALITY,
+            ): image
+            for image in images
+        }
+        for future in as_completed(futures):
+            try:
+                written += future.result()
+            except Exception as exc:
+                failed += 1
+                print(f"❌ {futures[future]}: {exc}")
+
+    print(f"✅ Wrote {written} variant files; {failed} images failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())